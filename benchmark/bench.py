@@ -0,0 +1,149 @@
+import argparse
+import os
+import sys
+import time
+
+import protod
+from protod.decode import Context, decode_all_fields
+from protod.field import RepeatedField, Struct
+from protod.util import _detect, _detect_cached, detect_multi_charset
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from payload import TEXTS, PayloadGenerator
+
+# Benchmark the hot paths separately:
+#   1. decoding without charset detection
+#   2. each str_decoder on all length-delimited fields
+#   3. each renderer on an already decoded field tree
+#
+# usage:
+#
+#  python benchmark/bench.py --size 1048576 --depth 4
+#
+
+
+# a str_decoder that does nothing, to measure the decoding only
+def no_str(view):
+    return view, "", False
+
+
+def walk(fields):
+    for f in fields:
+        if type(f) is RepeatedField:
+            yield from walk(f.items)
+        else:
+            yield f
+            if type(f) is Struct:
+                yield from walk(f.as_fields)
+
+
+# run `fn` `repeat` times, return the best time
+def best_of(repeat, fn):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+# `n_fields`: fields processed by the benchmark, None if it's not known
+def report(name, seconds, n_bytes, n_fields):
+    mb = n_bytes / 1024 / 1024
+    line = f"{name:<32} {seconds * 1000:>10.2f} ms {mb / seconds:>10.2f} MB/s"
+    if n_fields is not None:
+        line += f" {n_fields / seconds:>14.0f} fields/s"
+    print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", type=int, default=256 * 1024, help="payload size in bytes")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--depth", type=int, default=3, help="max nesting depth")
+    parser.add_argument("--fields", type=int, default=8, help="fields in each message")
+    parser.add_argument("--repeated", type=int, default=4, help="max items of repeated fields")
+    parser.add_argument("--str_ratio", type=float, default=0.4)
+    parser.add_argument("--bin_ratio", type=float, default=0.2)
+    parser.add_argument("--charsets", type=str, default=",".join(TEXTS), help="comma separated")
+    parser.add_argument("--repeat", type=int, default=3, help="run each benchmark n times, report the best")
+    args = parser.parse_args()
+
+    data = PayloadGenerator(
+        seed=args.seed,
+        depth=args.depth,
+        fields=args.fields,
+        repeated=args.repeated,
+        str_ratio=args.str_ratio,
+        bin_ratio=args.bin_ratio,
+        charsets=args.charsets.split(","),
+    ).generate(args.size)
+
+    buf = memoryview(data)
+
+    # 1. decoding
+    def decode():
+        ctx = Context(str_decoder=no_str)
+        return decode_all_fields(ctx, None, buf, 0, len(buf))
+
+    fields = decode()
+    all_fields = list(walk(fields))
+    structs = [f for f in all_fields if type(f) is Struct]
+    n_fields = len(all_fields)
+    n_top_level = sum(len(f.items) if type(f) is RepeatedField else 1 for f in fields)
+    str_bytes = sum(len(s.view) for s in structs)
+
+    print(
+        f"payload: {len(data)} bytes, {n_fields} fields, {n_top_level} top-level fields, "
+        f"{len(structs)} length-delimited fields"
+    )
+    print()
+
+    report("decode_all_fields", best_of(args.repeat, decode), len(data), n_fields)
+    report(
+        "is_valid_fields",
+        best_of(args.repeat, lambda: protod.decode.is_valid_fields(buf, 0, len(buf))),
+        len(data),
+        n_top_level,  # only the top-level fields are walked
+    )
+    report(
+        "get (last top-level field)",
+        best_of(args.repeat, lambda: protod.get(data, [fields[-1].idtype.id])),
+        len(data),
+        None,  # it stops at the first top-level field with the id
+    )
+
+    # 2. str_decoders
+    views = [s.view for s in structs]
+
+    def run_str_decoder(str_decoder):
+        for v in views:
+            str_decoder(v)
+
+    def detect_cold():
+        _detect_cached.cache_clear()
+        run_str_decoder(detect_multi_charset)
+
+    report("detect_multi_charset (no cache)", best_of(1, lambda: [_detect(v.tobytes()) for v in views]), str_bytes, len(views))
+    report("detect_multi_charset (cold)", best_of(args.repeat, detect_cold), str_bytes, len(views))
+    report("detect_multi_charset (warm)", best_of(args.repeat, lambda: run_str_decoder(detect_multi_charset)), str_bytes, len(views))
+
+    # 3. renderers, with the string and child fields already decoded
+    tree = protod.parse(data)
+    renderers = [
+        ("ConsoleRenderer", lambda: protod.ConsoleRenderer(no_color=True)),
+        ("HtmlRenderer", protod.HtmlRenderer),
+        ("JsonRenderer", protod.JsonRenderer),
+    ]
+    for name, new_renderer in renderers:
+        report(name, best_of(args.repeat, lambda: protod.render(tree, new_renderer())), len(data), n_fields)
+
+    # 4. end to end
+    report("dump", best_of(args.repeat, lambda: protod.dump(data)), len(data), n_fields)
+    report("dump (streaming)", best_of(args.repeat, lambda: protod.dump(data, streaming=True)), len(data), n_fields)
+
+
+if __name__ == "__main__":
+    main()
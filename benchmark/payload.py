@@ -0,0 +1,99 @@
+import random
+import struct
+
+# Synthetic protobuf payload generator for benchmarking
+#
+# usage:
+#
+#  gen = PayloadGenerator(seed=1, depth=3, repeated=5)
+#  data = gen.generate(1024 * 1024)  # about 1MB
+#
+
+# sample texts in different charsets
+TEXTS = {
+    "ascii": "the quick brown fox jumps over the lazy dog",
+    "utf-8": "Winniéééé thé Dictator, 维尼熊, くまのプーさん",
+    "gbk": "你的名字你的名字，坐标系统",
+    "shift_jis": "デスクトップ、ダウンロード、ドキュメント",
+    "big5": "《變形金剛》中文版，火種源",
+}
+
+
+def encode_varint(n: int) -> bytes:
+    n &= 0xFFFFFFFFFFFFFFFF
+    ret = bytearray()
+    while n >= 0x80:
+        ret.append((n & 0x7F) | 0x80)
+        n >>= 7
+    ret.append(n)
+    return bytes(ret)
+
+
+def encode_tag(id: int, wire_type: int) -> bytes:
+    return encode_varint((id << 3) | wire_type)
+
+
+class PayloadGenerator:
+    #   seed: random seed, same seed generates same payloads
+    #   depth: max nesting depth of child messages
+    #   fields: number of fields in each message
+    #   repeated: max number of items of repeated fields
+    #   str_ratio: ratio of strings among length-delimited fields
+    #   bin_ratio: ratio of random binary among length-delimited fields
+    #              the rest are child messages
+    #   charsets: charsets of strings, see `TEXTS`
+    def __init__(
+        self,
+        seed=0,
+        depth=3,
+        fields=8,
+        repeated=4,
+        str_ratio=0.4,
+        bin_ratio=0.2,
+        charsets=tuple(TEXTS),
+    ):
+        self.rand = random.Random(seed)
+        self.depth = depth
+        self.fields = fields
+        self.repeated = repeated
+        self.str_ratio = str_ratio
+        self.bin_ratio = bin_ratio
+        self.charsets = charsets
+
+    # generate top-level fields until it reaches `size` bytes
+    def generate(self, size: int) -> bytes:
+        ret = bytearray()
+        id = 1
+        while len(ret) < size:
+            ret += self._field(id, self.depth)
+            id = id % 100 + 1
+        return bytes(ret)
+
+    def message(self, depth: int) -> bytes:
+        ret = bytearray()
+        for id in range(1, self.fields + 1):
+            for _ in range(self.rand.randint(1, self.repeated)):
+                ret += self._field(id, depth)
+        return bytes(ret)
+
+    def _field(self, id: int, depth: int) -> bytes:
+        r = self.rand.random()
+
+        if r < 0.3:  # varint, from 1 byte to 10 bytes
+            return encode_tag(id, 0) + encode_varint(self.rand.getrandbits(self.rand.choice([6, 13, 32, 64])))
+        if r < 0.4:  # fixed32
+            return encode_tag(id, 5) + struct.pack("<f", self.rand.random())
+        if r < 0.5:  # fixed64
+            return encode_tag(id, 1) + struct.pack("<d", self.rand.random())
+
+        r = self.rand.random()
+        if r < self.str_ratio:
+            charset = self.rand.choice(self.charsets)
+            text = TEXTS[charset]
+            payload = text[: self.rand.randint(1, len(text))].encode(charset)
+        elif r < self.str_ratio + self.bin_ratio or depth <= 0:
+            payload = self.rand.randbytes(self.rand.randint(1, 64))
+        else:
+            payload = self.message(depth - 1)
+
+        return encode_tag(id, 2) + encode_varint(len(payload)) + payload
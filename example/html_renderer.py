@@ -1,7 +1,6 @@
-from protod import ConsoleRenderer
+import protod
 
-
-# The HtmlRenderer builds a full html div string,
+# The HtmlRenderer is shipped with protod, it builds a full html div string,
 # which can be simply set to a <div>
 #
 # usage:
@@ -10,33 +9,8 @@ from protod import ConsoleRenderer
 #  send the html_tag to client browser
 #  $('#div').text(html_tag)
 #
-class HtmlRenderer(ConsoleRenderer):
-
-    def _add_indent(self, level):
-        self._add("&nbsp;" * 4 * level)
-
-    def _add_newline(self):
-        self._add("</br>")
-
-    def _add_normal(self, s):
-        self._add(s)
-
-    def _add_idtype(self, s):
-        self._add(f"<font color='#ff2200'>{s}</font>")
-
-    def _add_id(self, s):
-        self._add(f"<font color='#00ff11'>{s}</font>")
-
-    def _add_type(self, s):
-        self._add(f"<font color='#808000'>{s}</font>")
-
-    def _add_num(self, s):
-        self._add(f"<font color='cyan'>{s}</font>")
-
-    def _add_str(self, s):
-        self._add(f"<font color='blue'>{escape(s)}</font>")
+# To customize the colors, subclass it and override the `_add_xxx` methods,
+# see `protod/renderer.py`
 
-    def _add_bin(self, s):
-        self._add(
-            f"<font color='yellow'>{escape(' '.join(format(x, '02x') for x in s))}</font>"
-        )
+html_tag = protod.dump(bytes.fromhex("0a0a0a0408011002120268691a03010203"), protod.HtmlRenderer())
+print(html_tag)
@@ -1,3 +1,5 @@
+from functools import partial
+
 from mitmproxy import contentviews, ctx
 from mitmproxy.addonmanager import Loader
 
@@ -64,6 +66,15 @@ class MitmproxyRenderer(ConsoleRenderer):
             self._add_normal(" ...")
 
 
+# Keep the view responsive with hostile or unlucky payloads,
+# data out of the budgets is shown as bytes
+LIMITS = protod.Limits(max_depth=64, max_fields=100000, max_detect_bytes=1 << 20, timeout=1)
+
+# The same body is rendered again when it's viewed again,
+# and the same bodies are common, eg: heartbeats, polling responses
+CACHE = protod.DumpCache(max_bytes=64 * 1024 * 1024)
+
+
 class ViewProto(contentviews.Contentview):
     name = "ViewProto"
 
@@ -79,7 +90,7 @@ class ViewProto(contentviews.Contentview):
         # except Exception as e:
         #     ctx.log.error(e)
         # return "aaaaaaaaaaaaaaaaa"
-        return protod.dump(data, renderer=ConsoleRenderer(no_color=True))
+        return CACHE.dump(data, partial(ConsoleRenderer, no_color=True), limits=LIMITS)
 
     def render_priority(self, data: bytes, metadata: contentviews.Metadata) -> float:
         # ctx.log.warn(metadata.flow.server_conn)
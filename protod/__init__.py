@@ -1,3 +1,12 @@
 __all__ = ["decode"]
-from .decode import dump
-from .renderer import ConsoleRenderer, Renderer
+from .aio import dump_async
+from .batch import dump_many
+from .cache import DumpCache
+from .decode import dump, dump_file, parse, render
+from .definition import DecodePolicy, PackedType
+from .json_renderer import JsonRenderer, dump_jsonl, to_json
+from .limits import Limits
+from .query import Path, get
+from .renderer import ConsoleRenderer, HtmlRenderer, Renderer, StreamRenderer
+from .stats import Stats
+from .stream import Framing, iter_messages
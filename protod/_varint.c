@@ -0,0 +1,59 @@
+// Optional compiled varint decoder, see varint.py
+#define PY_SSIZE_T_CLEAN
+#include <Python.h>
+#include <stdint.h>
+
+static PyObject *decode_varint(PyObject *self, PyObject *const *args, Py_ssize_t nargs) {
+    if (nargs != 2) {
+        PyErr_SetString(PyExc_TypeError, "decode_varint(buf, pos) takes 2 arguments");
+        return NULL;
+    }
+
+    Py_ssize_t pos = PyLong_AsSsize_t(args[1]);
+    if (pos == -1 && PyErr_Occurred()) {
+        return NULL;
+    }
+
+    Py_buffer view;
+    if (PyObject_GetBuffer(args[0], &view, PyBUF_SIMPLE) < 0) {
+        return NULL;
+    }
+
+    const uint8_t *p = (const uint8_t *)view.buf;
+    Py_ssize_t len = view.len;
+    uint64_t result = 0;
+    int shift = 0;
+
+    for (;;) {
+        if (pos < 0 || pos >= len) {
+            PyBuffer_Release(&view);
+            PyErr_SetString(PyExc_IndexError, "index out of range");
+            return NULL;
+        }
+        uint8_t b = p[pos++];
+        result |= (uint64_t)(b & 0x7F) << shift;
+        if (!(b & 0x80)) {
+            break;
+        }
+        shift += 7;
+        if (shift >= 64) {
+            PyBuffer_Release(&view);
+            PyErr_SetString(PyExc_Exception, "Too many bytes when decoding varint.");
+            return NULL;
+        }
+    }
+
+    PyBuffer_Release(&view);
+    return Py_BuildValue("(Kn)", (unsigned long long)result, pos);
+}
+
+static PyMethodDef methods[] = {
+    {"decode_varint", (PyCFunction)(void (*)(void))decode_varint, METH_FASTCALL, NULL},
+    {NULL, NULL, 0, NULL},
+};
+
+static struct PyModuleDef module = {
+    PyModuleDef_HEAD_INIT, "_varint", NULL, -1, methods,
+};
+
+PyMODINIT_FUNC PyInit__varint(void) { return PyModule_Create(&module); }
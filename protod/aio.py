@@ -0,0 +1,79 @@
+from functools import partial
+from time import perf_counter
+
+from .decode import Context, _walkable, dump, iter_stream_top_level
+from .definition import DecodePolicy
+from .limits import Limits
+from .renderer import ConsoleRenderer, StreamRenderer
+from .util import detect_multi_charset
+
+# In the cooperative mode, the decoder pauses after every `CHUNK_FIELDS` fields,
+# and yields to the event loop if it has run for more than `time_slice` seconds,
+# fields vary a lot in cost, eg: a large string with a heavy charset detector
+CHUNK_FIELDS = 16
+TIME_SLICE = 0.005
+
+
+# The async version of `dump`, for event loop based proxies and servers.
+#
+#   executor: a `concurrent.futures.Executor`, the decoding runs in it:
+#     - ThreadPoolExecutor: the loop runs between the gil switches
+#     - ProcessPoolExecutor: fully parallel, but `renderer` and `str_decoder`
+#       must be picklable and `data` must be bytes, the result is sent back
+#   If `executor` is None, it decodes in the event loop in streaming mode,
+#   and yields to the loop after every `time_slice` seconds, so a large
+#   payload doesn't block other tasks. `lazy` is ignored.
+#   Unless `streaming`, only a walkable renderer can be driven in the loop with
+#   the same result as `dump`, eg: a subclass that overrides `render_struct`
+#   is not, it runs in the loop's default thread pool instead, so does
+#   a renderer that is not a `StreamRenderer`.
+#
+# eg:
+#   s = await protod.dump_async(data, protod.ConsoleRenderer())
+#   s = await protod.dump_async(data, executor=process_pool)
+async def dump_async(
+    data: bytes,
+    renderer=None,
+    str_decoder=detect_multi_charset,
+    lazy=False,
+    policy=DecodePolicy.StrFirst,
+    streaming=False,
+    limits: Limits = None,
+    executor=None,
+    time_slice=TIME_SLICE,
+):
+    import asyncio  # slow to import, it's already imported by the caller's event loop
+
+    if renderer == None:
+        renderer = ConsoleRenderer()
+
+    if streaming:
+        in_loop = isinstance(renderer, StreamRenderer)
+    else:
+        in_loop = _walkable(renderer)
+
+    if executor is not None or not in_loop:
+        return await asyncio.get_running_loop().run_in_executor(
+            executor,
+            partial(
+                dump,
+                data,
+                renderer,
+                str_decoder=str_decoder,
+                lazy=lazy,
+                policy=policy,
+                streaming=streaming,
+                limits=limits,
+            ),
+        )
+
+    buf = memoryview(data)
+    ctx = Context(str_decoder=str_decoder, lazy=True, policy=policy, limits=limits)
+
+    slice_end = perf_counter() + time_slice
+    for _ in iter_stream_top_level(ctx, renderer, buf, CHUNK_FIELDS):
+        if perf_counter() >= slice_end:
+            await asyncio.sleep(0)
+            slice_end = perf_counter() + time_slice
+
+    return renderer.build_result()
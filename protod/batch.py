@@ -0,0 +1,44 @@
+from functools import partial
+from typing import Iterable, List
+
+from .decode import dump
+from .definition import DecodePolicy
+from .renderer import ConsoleRenderer
+from .util import detect_multi_charset
+
+
+def _dump_1(renderer_factory, str_decoder, lazy, policy, data: bytes):
+    return dump(
+        data,
+        renderer_factory(),
+        str_decoder=str_decoder,
+        lazy=lazy,
+        policy=policy,
+    )
+
+
+# Dump independent payloads in parallel with a process pool,
+# return the results in the same order as the payloads.
+#
+#   renderer_factory: creates a new renderer for each payload, it's called in
+#     the worker processes, so it must be picklable, eg: a class or a module level function
+#   workers: number of processes, default: number of cpus, 1 means no process pool
+#   chunksize: number of payloads sent to a worker at a time
+def dump_many(
+    payloads: Iterable[bytes],
+    renderer_factory=ConsoleRenderer,
+    workers=None,
+    chunksize=1,
+    str_decoder=detect_multi_charset,
+    lazy=False,
+    policy=DecodePolicy.StrFirst,
+) -> List:
+    dump_1 = partial(_dump_1, renderer_factory, str_decoder, lazy, policy)
+
+    if workers == 1:
+        return [dump_1(data) for data in payloads]
+
+    from concurrent.futures import ProcessPoolExecutor  # slow to import
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(dump_1, payloads, chunksize=chunksize))
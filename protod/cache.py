@@ -0,0 +1,220 @@
+import io
+import os
+from collections import OrderedDict
+from functools import partial
+from time import perf_counter
+
+from .decode import dump
+from .definition import DecodePolicy
+from .limits import Limits
+from .renderer import ConsoleRenderer
+from .util import detect_multi_charset
+
+# Version of the rendered output, it's part of the cache key,
+# bump it when a change of protod changes the result of any renderer,
+# so the results stored on disk by an older version are not served.
+FORMAT_VERSION = 2
+
+
+# A stable name of a renderer factory or str_decoder, for the cache key,
+# they must be module level functions/classes, or `partial` of them,
+# lambdas and closures of a module share the same name, they are rejected
+def _callable_key(f):
+    if isinstance(f, partial):
+        return (_callable_key(f.func), f.args, tuple(sorted(f.keywords.items())))
+
+    qualname = getattr(f, "__qualname__", None)
+    if qualname is None or "<lambda>" in qualname or "<locals>" in qualname:
+        raise Exception(
+            f"{f!r} has no stable name for the cache key, "
+            "use a module level function/class, or pass `key`"
+        )
+    return f"{f.__module__}.{qualname}"
+
+
+# The directory is trusted for the cached results, it must be owned by
+# the current user and not writable by others
+def _check_dir(path: str):
+    st = os.stat(path)
+    if hasattr(os, "getuid") and st.st_uid != os.getuid():
+        raise Exception(f"cache directory {path} is not owned by the current user")
+    if st.st_mode & 0o022:
+        raise Exception(f"cache directory {path} is writable by other users")
+
+
+# Cache of `dump` results, keyed on the hash of the payload and the settings
+# that affect the result, so the same payload is only decoded once.
+#
+#   max_bytes: the in-memory results are evicted in LRU order when their total
+#     size exceeds it, the size of a result is its pickled size
+#   path: optional directory to also store the results on disk, shared by
+#     processes and kept between runs, it's not bounded. Only string results,
+#     eg: of ConsoleRenderer/HtmlRenderer, are stored there, as plain text.
+#     It's created with mode 0o700, an existing one must be owned by the
+#     current user and not writable by others.
+#
+# In memory, results are stored pickled, each hit returns a new copy, so it's
+# safe to modify the result, eg: the dict of `JsonRenderer`.
+# A result that may be degraded by `Limits.timeout` is not cached.
+# Renderers that write to an `out` sink can't be cached, their result is "".
+#
+# eg:
+#   cache = protod.DumpCache(max_bytes=64 * 1024 * 1024)
+#   s = cache.dump(data, partial(protod.ConsoleRenderer, no_color=True))
+class DumpCache:
+    def __init__(self, max_bytes=64 * 1024 * 1024, path=None):
+        import threading  # these modules are slow to import, only import when used
+
+        self.max_bytes = max_bytes
+        self.path = path
+        if path is not None:
+            os.makedirs(path, mode=0o700, exist_ok=True)
+            _check_dir(path)
+
+        self._results = OrderedDict()  # key -> pickled result, the last one is the most recent
+        self._size = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    # Same as `dump`, but takes a `renderer_factory` instead of a renderer,
+    # a new renderer is only created when the payload is not cached.
+    # `lazy` is not an option, it doesn't change the result.
+    #
+    # `key`: optional name of the renderer_factory and str_decoder, it's used
+    #   instead of their function names, required if they are lambdas or closures,
+    #   different settings must use different keys.
+    def dump(
+        self,
+        data: bytes,
+        renderer_factory=ConsoleRenderer,
+        str_decoder=detect_multi_charset,
+        policy=DecodePolicy.StrFirst,
+        streaming=False,
+        limits: Limits = None,
+        key: str = None,
+    ):
+        import pickle
+
+        key = self.key(data, renderer_factory, str_decoder, policy, streaming, limits, key)
+
+        pickled = self._get(key)
+        if pickled is not None:
+            return pickle.loads(pickled)
+
+        renderer = renderer_factory()
+        out = getattr(renderer, "out", None)
+        if out is not None and not isinstance(out, io.StringIO):
+            raise Exception("can't cache a renderer that writes to `out`")
+
+        start = perf_counter()
+        result = dump(
+            data,
+            renderer,
+            str_decoder=str_decoder,
+            lazy=True,
+            policy=policy,
+            streaming=streaming,
+            limits=limits,
+        )
+
+        if limits is None or limits.timeout is None or perf_counter() - start < limits.timeout:
+            self._put(key, result)
+
+        return result
+
+    # hex digest of the payload and the settings, see `dump` for `name`
+    def key(
+        self, data, renderer_factory, str_decoder, policy, streaming, limits, name=None
+    ) -> str:
+        import hashlib
+
+        limits_key = None
+        if limits is not None:
+            limits_key = (limits.max_depth, limits.max_fields, limits.max_detect_bytes, limits.timeout)
+
+        if name is not None:
+            callables_key = ("key", name)
+        else:
+            callables_key = (_callable_key(renderer_factory), _callable_key(str_decoder))
+
+        settings = (FORMAT_VERSION, callables_key, policy, streaming, limits_key)
+
+        h = hashlib.blake2b(repr(settings).encode(), digest_size=20)
+        h.update(data)
+        return h.hexdigest()
+
+    def clear(self):
+        with self._lock:
+            self._results.clear()
+            self._size = 0
+
+    def __len__(self):
+        return len(self._results)
+
+    # return the pickled result, or None
+    def _get(self, key: str):
+        import pickle
+
+        with self._lock:
+            pickled = self._results.get(key)
+            if pickled is not None:
+                self._results.move_to_end(key)
+                self.hits += 1
+                return pickled
+
+        if self.path is not None:
+            try:
+                with open(os.path.join(self.path, key), "r", encoding="utf-8") as f:
+                    text = f.read()
+            except (OSError, UnicodeDecodeError):
+                pass
+            else:
+                pickled = pickle.dumps(text, protocol=pickle.HIGHEST_PROTOCOL)
+                self._put_memory(key, pickled)
+                with self._lock:
+                    self.hits += 1
+                return pickled
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def _put(self, key: str, result):
+        import pickle
+
+        self._put_memory(key, pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL))
+
+        if self.path is not None and type(result) is str:
+            # write to a temporary file first, readers never see a partial file
+            from threading import get_ident
+
+            file_path = os.path.join(self.path, key)
+            tmp_path = f"{file_path}.{os.getpid()}.{get_ident()}.tmp"
+            try:
+                with open(tmp_path, "w", encoding="utf-8", newline="") as f:
+                    f.write(result)
+                os.replace(tmp_path, file_path)
+            except OSError:  # the disk store is best effort
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+
+    def _put_memory(self, key: str, pickled: bytes):
+        size = len(pickled)
+        if size > self.max_bytes:  # never fits
+            return
+
+        with self._lock:
+            old = self._results.pop(key, None)
+            if old is not None:
+                self._size -= len(old)
+
+            self._results[key] = pickled
+            self._size += size
+
+            while self._size > self.max_bytes:
+                _, evicted = self._results.popitem(last=False)
+                self._size -= len(evicted)
@@ -1,13 +1,275 @@
-import itertools
+import mmap
+import os
+import stat
 import struct
+from time import perf_counter
 from typing import List
 
-from google.protobuf.internal.decoder import _DecodeVarint
+from .definition import DecodePolicy, WireType
+from .field import Field, Fixed, IdType, RepeatedField, Struct, Varint, index_fields
+from .limits import Limits
+from .renderer import ConsoleRenderer, StreamRenderer
+from .stats import Stats
+from .util import detect_multi_charset, detect_multi_charset_profiled, looks_like_text
+from .varint import decode_varint
+
+# `Limits.timeout` is checked after every `DEADLINE_FIELDS` top-level fields,
+# reading the clock for each field would slow down the decoding
+DEADLINE_FIELDS = 256
+
+
+# Options shared by all fields of a single decoding pass
+#   str_decoder: detects the charset of a Struct, see `util.detect_multi_charset`
+#   lazy: decode child messages and strings only when they are accessed
+#   policy: see `DecodePolicy`
+#   limits: optional budgets of this pass, see `Limits`
+class Context:
+    def __init__(
+        self,
+        str_decoder=detect_multi_charset,
+        lazy=False,
+        policy=DecodePolicy.StrFirst,
+        limits: Limits = None,
+    ):
+        self.str_decoder = str_decoder
+        self.lazy = lazy
+        self.policy = policy
+        self.limits = limits
+
+        self._idtypes = {}  # (id_type, raw length) -> shared IdType
+
+        # the top-level position where `limits.timeout` stopped the decoding
+        self.stopped_at = None
+
+        # remaining budgets, only used when `limits` is set
+        if limits is not None:
+            self._fields_left = limits.max_fields
+            self._detect_left = limits.max_detect_bytes
+            self._deadline = None
+            if limits.timeout is not None:
+                self._deadline = perf_counter() + limits.timeout
+
+    # return the shared IdType of the id_type at `buf[start:end]`
+    def idtype(self, id_type: int, buf: memoryview, start: int, end: int) -> IdType:
+        key = (id_type, end - start)
+        ret = self._idtypes.get(key)
+        if ret is None:
+            ret = IdType(id_type >> 3, id_type & 7, buf[start:end].tobytes())
+            self._idtypes[key] = ret
+        return ret
+
+    # detect the charset of a struct, return (decoded, encoding, is string)
+    def decode_str(self, struct) -> tuple[bytes, str, bool]:
+        if self.policy == DecodePolicy.FieldsFirst and struct.has_fields:
+            view_bytes = struct.view.tobytes()
+
+            # it's child fields and can't be a printable string, no need to detect
+            if not looks_like_text(view_bytes):
+                return view_bytes, "", False
+
+        if self.limits is not None and not self._take_detect_budget(len(struct.view)):
+            return struct.view.tobytes(), "", False
+
+        return self.str_decoder(struct.view)
+
+    # whether a struct can be decoded as child fields, without decoding them
+    # it's called once for each struct, see `Struct.has_fields`
+    def has_children(self, struct) -> bool:
+        if struct.end <= struct.start:
+            return False
+
+        if self.limits is not None:
+            return self._has_children_limited(struct)
+
+        return is_valid_fields(struct.buf, struct.start, struct.end)
+
+    # try to decode a struct as child fields, return [] if it's just bytes
+    def decode_children(self, struct, index=None) -> List[Field]:
+        # if it's valid, it's child struct, not just binary bytes
+        if not struct.has_fields:
+            return []
+
+        return decode_all_fields(self, struct, struct.buf, struct.start, struct.end, index)
+
+    # the end of the top-level fields in `buf[start:end]` that fit in the field budget
+    def top_level_end(self, buf, start: int, end: int) -> int:
+        if self.limits is None or self._fields_left is None:
+            return end
+
+        pos, n = start, 0
+        while pos < end and n < self._fields_left:
+            _, next_pos = skip_1_field(buf, pos, end)
+            if next_pos < 0:  # invalid, leave it to `decode_all_fields` to report
+                return end
+            pos, n = next_pos, n + 1
+
+        self._fields_left -= n
+        return pos
+
+    # the undecoded `buf[start:end]` as a Struct that is always shown as bytes,
+    # its field number is 0, which never appears in valid data
+    def remainder(self, buf, start: int, end: int) -> Struct:
+        ret = Struct(buf, start, end, self)
+        ret.idtype = IdType(0, WireType.Struct, b"")
+        ret.as_fields = []
+        ret._as_str = (buf[start:end].tobytes(), "", False)
+        return ret
+
+    def _expired(self) -> bool:
+        return self._deadline is not None and perf_counter() > self._deadline
+
+    # whether the top-level decoding has to check `limits.timeout`
+    def _has_deadline(self) -> bool:
+        return self.limits is not None and self._deadline is not None
+
+    def _take_detect_budget(self, n_bytes: int) -> bool:
+        if self._expired():
+            return False
+
+        if self._detect_left is not None:
+            if n_bytes > self._detect_left:
+                return False
+            self._detect_left -= n_bytes
+
+        return True
+
+    def _has_children_limited(self, struct) -> bool:
+        max_depth = self.limits.max_depth
+        if max_depth is not None and struct.depth >= max_depth:
+            return False
+
+        if self._expired():
+            return False
+
+        if self._fields_left is None:
+            return is_valid_fields(struct.buf, struct.start, struct.end)
+
+        # a message is either decoded as a whole or shown as bytes
+        n = count_fields(struct.buf, struct.start, struct.end)
+        if n < 0 or n > self._fields_left:
+            return False
+
+        self._fields_left -= n
+        return True
+
+
+# A Context that counts into a `Stats` while decoding, only used when
+# `dump` is called with `stats`, so the normal decoding has no overhead.
+class _ProfilingContext(Context):
+    def __init__(self, stats: Stats, str_decoder, lazy, policy, limits):
+        super().__init__(self._detect, lazy, policy, limits)
+
+        self.stats = stats
+        self._str_decoder = str_decoder
 
-from .definition import WireType
-from .field import Field, Fixed, IdType, RepeatedField, Struct, Varint
-from .renderer import ConsoleRenderer
-from .util import detect_multi_charset
+    # it's called once for every field
+    def idtype(self, id_type: int, buf: memoryview, start: int, end: int) -> IdType:
+        fields = self.stats.fields
+        wire_type = id_type & 7
+        fields[wire_type] = fields.get(wire_type, 0) + 1
+
+        return super().idtype(id_type, buf, start, end)
+
+    def has_children(self, struct) -> bool:
+        start = perf_counter()
+        ret = super().has_children(struct)
+        self.stats.add_time("check_children", perf_counter() - start)
+
+        self.stats.child_checks += 1
+        if not ret:
+            self.stats.failed_child_checks += 1
+
+        return ret
+
+    # the str_decoder
+    def _detect(self, view) -> tuple[bytes, str, bool]:
+        start = perf_counter()
+        if self._str_decoder is detect_multi_charset:
+            ret, detector = detect_multi_charset_profiled(view)
+        else:
+            ret = self._str_decoder(view)
+            detector = getattr(self._str_decoder, "__name__", "custom")
+        self.stats.add_time("detect", perf_counter() - start)
+
+        self.stats.add_detector(detector, len(view))
+
+        return ret
+
+
+# Read a varint at `buf[pos:end]` without raising
+# return (value, new pos), the new pos is -1 if the varint is invalid
+def _read_varint(buf, pos: int, end: int) -> tuple[int, int]:
+    result = 0
+    shift = 0
+    while pos < end:
+        b = buf[pos]
+        pos += 1
+        result |= (b & 0x7F) << shift
+        if not (b & 0x80):
+            return result, pos
+        shift += 7
+        if shift >= 70:  # at most 10 bytes
+            break
+    return 0, -1
+
+
+# Skip 1 field at `buf[pos:end]` without decoding it or raising
+# return (id_type, position after the field), the position is -1 if it's invalid
+def skip_1_field(buf, pos: int, end: int) -> tuple[int, int]:
+    id_type, pos = _read_varint(buf, pos, end)
+
+    if pos < 0 or pos >= end:
+        return 0, -1
+
+    if (id_type >> 3) > 536870911:
+        return 0, -1
+
+    wire_type = id_type & 7
+
+    if wire_type == WireType.Varint:
+        _, pos = _read_varint(buf, pos, end)
+    elif wire_type == WireType.Fixed32:
+        pos += 4
+    elif wire_type == WireType.Fixed64:
+        pos += 8
+    elif wire_type == WireType.Struct:
+        s_len, pos = _read_varint(buf, pos, end)
+        if pos >= 0:
+            pos += s_len
+    else:
+        return 0, -1
+
+    if pos > end:
+        return 0, -1
+
+    return id_type, pos
+
+
+# A cheap structural check of whether `buf[start:end]` can be decoded as fields,
+# it accepts exactly what `decode_all_fields` accepts, but without building
+# any `Field` or raising any exception.
+def is_valid_fields(buf, start: int, end: int) -> bool:
+    pos = start
+
+    while pos < end:
+        _, pos = skip_1_field(buf, pos, end)
+        if pos < 0:
+            return False
+
+    return True
+
+
+# Same as `is_valid_fields`, but return the number of fields, or -1 if it's invalid
+def count_fields(buf, start: int, end: int) -> int:
+    pos, n = start, 0
+
+    while pos < end:
+        _, pos = skip_1_field(buf, pos, end)
+        if pos < 0:
+            return -1
+        n += 1
+
+    return n
 
 
 # 0	Varint	int32, int64, uint32, uint64, sint32, sint64, bool, enum
@@ -16,12 +278,16 @@ from .util import detect_multi_charset
 # 3	Start group	groups (deprecated)
 # 4	End group	groups (deprecated)
 # 5	32-bit	fixed32, sfixed32, float
-def decode_1_field(str_decoder, parent: Field, view: memoryview) -> tuple[Field, int]:
-    pos = 0
+# Decode 1 field at `buf[pos:end]`
+# `pos` and `end` are absolute offsets within `buf`, the returned position too
+def decode_1_field(
+    ctx: Context, parent: Field, buf: memoryview, pos: int, end: int
+) -> tuple[Field, int]:
+    start = pos
 
-    id_type, pos = _DecodeVarint(view, 0)
+    id_type, pos = decode_varint(buf, pos)
 
-    if pos >= len(view):
+    if pos >= end:
         raise Exception("not enough data for any further wire type")
 
     id = id_type >> 3
@@ -31,61 +297,45 @@ def decode_1_field(str_decoder, parent: Field, view: memoryview) -> tuple[Field,
 
     wire_type = id_type & 7
 
-    idtype_bytes = view[0:pos]
+    idtype = ctx.idtype(id_type, buf, start, pos)
 
     ret = None
 
     if wire_type == WireType.Varint:  # 0
-        if pos >= len(view):
-            raise Exception("not enough data for wire type 0(varint)")
+        u64, pos = decode_varint(buf, pos)
 
-        u64, pos = _DecodeVarint(view, pos)
+        if pos > end:
+            raise Exception("not enough data for wire type 0(varint)")
 
         ret = Varint(u64)
 
     elif wire_type == WireType.Fixed32:  # 5
-        if pos + 4 > len(view):
+        if pos + 4 > end:
             raise Exception("not enough data for wire type 5(fixed32)")
 
-        _4bytes = view[pos : pos + 4]
+        u = struct.unpack_from("<I", buf, pos)[0]  # unsigned
         pos += 4
 
-        u = struct.unpack("<I", _4bytes)[0]  # unsigned
-        i = struct.unpack("<i", _4bytes)[0]  # signed
-        f = struct.unpack("<f", _4bytes)[0]  # float
-        ret = Fixed(u, i, f)
+        ret = Fixed(u, 4)
 
     elif wire_type == WireType.Fixed64:  # 1
-        if pos + 8 > len(view):
+        if pos + 8 > end:
             raise Exception("not enough data for wire type 1(fixed64)")
 
-        _8bytes = view[pos : pos + 8]
+        u = struct.unpack_from("<Q", buf, pos)[0]  # unsigned
         pos += 8
 
-        u = struct.unpack("<q", _8bytes)[0]  # unsigned
-        i = struct.unpack("<Q", _8bytes)[0]  # signed
-        f = struct.unpack("<d", _8bytes)[0]  # float
-
-        ret = Fixed(u, i, f)
+        ret = Fixed(u, 8)
 
     elif wire_type == WireType.Struct:  # 2
-        s_len, pos = _DecodeVarint(view, pos)
+        s_len, pos = decode_varint(buf, pos)
 
-        if pos + s_len > len(view):
+        if pos + s_len > end:
             raise Exception("not enough data for wire type 2(string)")
 
-        view_field = view[pos : pos + s_len]
+        ret = Struct(buf, pos, pos + s_len, ctx)
         pos += s_len
 
-        as_str, encoding, is_str = str_decoder(view_field)
-        ret = Struct(view_field, as_str, encoding, is_str)
-
-        try:
-            # if decode successfully, it's child struct, not just binary bytes
-            ret.as_fields = decode_all_fields(str_decoder, ret, view_field)
-        except:
-            pass
-
     elif wire_type == WireType.Deprecated_3:  # 3
         raise Exception("[proto 3] found, looks like invalid proto bytes")
 
@@ -94,55 +344,397 @@ def decode_1_field(str_decoder, parent: Field, view: memoryview) -> tuple[Field,
     else:
         raise Exception(f"Unknown wire type {wire_type} of id_type {id_type}")
 
-    ret.idtype = IdType(id, wire_type, idtype_bytes)
+    ret.idtype = idtype
     ret.parent = parent
+    ret.depth = 0 if parent is None else parent.depth + 1
+    ret.offset, ret.length = start, pos - start
 
     return ret, pos
 
 
-def decode_all_fields(str_decoder, parent: Field, view: memoryview) -> List[Field]:
-    pos = 0
-    fields = []
+# The error of a field at `pos` in the children of `parent`,
+# `levels` is the number of messages that contain `parent`, each level adds
+# the offset of its field, as if the messages were decoded recursively.
+def _field_error(e: Exception, pos: int, parent: Field, levels: int) -> Exception:
+    err = Exception(f"invalid field at offset {pos}: {e}")
+    err.__cause__ = e
 
-    while pos < len(view):
-        try:
-            field, field_len = decode_1_field(str_decoder, parent, view[pos:])
-        except:
-            raise Exception(f"field: {view[pos:].tobytes()}")
+    for _ in range(levels):
+        cause, err = err, Exception(f"invalid field at offset {parent.offset}: {err}")
+        err.__cause__ = cause
+        parent = parent.parent
+
+    return err
 
-        fields.append(field)
-        pos += field_len
 
-    # group fields with same id to a RepeatedField
+# Decode all fields in `buf[start:end]`
+#
+# Unless `ctx.lazy`, child messages are decoded right after their struct field,
+# in the same order as a recursive decoder, but with an explicit stack
+# instead of recursion, so the nesting depth is not limited by the python stack.
+def decode_all_fields(
+    ctx: Context, parent: Field, buf: memoryview, start: int, end: int, index=None
+) -> List[Field]:
     ret = []
-    for _, group in itertools.groupby(fields, lambda f: f.idtype.id):
+    eager = not ctx.lazy
+    deadline = ctx._has_deadline()
+    n = 0  # top-level fields, the deadline is checked every `DEADLINE_FIELDS`
+
+    # messages being decoded: (parent, pos, end, fields)
+    stack = [(parent, start, end, ret)]
+
+    while stack:
+        parent, pos, end, fields = stack.pop()
+
+        while pos < end:
+            if deadline and parent is None:
+                n += 1
+                if n % DEADLINE_FIELDS == 0 and ctx._expired():
+                    ctx.stopped_at = pos
+                    break
+
+            try:
+                field, next_pos = decode_1_field(ctx, parent, buf, pos, end)
+
+                if eager and type(field) is Struct:
+                    field._decode_str()  # decode string right now
+            except Exception as e:
+                raise _field_error(e, pos, parent, len(stack))
+
+            pos = next_pos
+
+            # Adjacent fields with same id are grouped to a RepeatedField
+            # while decoding, the list keeps the wire order.
+            last = fields[-1] if fields else None
+
+            if last is None or last.idtype.id != field.idtype.id:  # single field
+                fields.append(field)
+            else:
+                if type(last) is not RepeatedField:
+                    repeated = RepeatedField([last])
+                    repeated.idtype = last.idtype
+                    repeated.parent = last.parent
+                    repeated.depth = last.depth
+                    repeated.offset = last.offset
+                    fields[-1] = last = repeated
+
+                last.items.append(field)
+                last.length = field.offset + field.length - last.offset
+
+            if eager and type(field) is Struct and field.has_fields:
+                # decode child fields right now,
+                # continue with this message after the child message
+                stack.append((parent, pos, end, fields))
+                stack.append((field, field.start, field.end, []))
+                break
+        else:
+            if fields is not ret:  # a child message is done
+                parent.as_fields = fields
+
+    # optional index: id -> the field or the RepeatedField
+    if index is not None:
+        index_fields(ret, index)
+
+    return ret
+
+
+# Decode fields in `buf[start:end]` and push them to a `StreamRenderer`
+# one by one, child messages are decoded right after their parent field,
+# no field is kept after it's rendered.
+# Like `decode_all_fields`, it uses an explicit stack instead of recursion.
+def stream_fields(
+    ctx: Context, r: StreamRenderer, parent: Field, buf: memoryview, start: int, end: int
+):
+    for _ in iter_stream_fields(ctx, r, parent, buf, start, end):
+        pass
+
+
+# Same as `stream_fields`, but it's a generator that pauses after every
+# `chunk_fields` fields, so the decoding can be split into chunks,
+# eg: to yield to an event loop, it never pauses if `chunk_fields` is 0
+def iter_stream_fields(
+    ctx: Context,
+    r: StreamRenderer,
+    parent: Field,
+    buf: memoryview,
+    start: int,
+    end: int,
+    chunk_fields=0,
+):
+    root = parent
+    n = 0  # fields since the last pause
+    deadline = ctx._has_deadline()
+    n_top = 0  # top-level fields, the deadline is checked every `DEADLINE_FIELDS`
+
+    # messages being decoded: (parent, pos, end)
+    stack = [(parent, start, end)]
+
+    while stack:
+        parent, pos, end = stack.pop()
+
+        while pos < end:
+            if deadline and parent is None:
+                n_top += 1
+                if n_top % DEADLINE_FIELDS == 0 and ctx._expired():
+                    ctx.stopped_at = pos
+                    break
+
+            try:
+                field, pos = decode_1_field(ctx, parent, buf, pos, end)
+            except Exception as e:
+                raise _field_error(e, pos, parent, len(stack))
+
+            r.on_field(field)
+
+            n += 1
+            pause = n == chunk_fields
+
+            if type(field) is Struct and field.has_fields:
+                r.start_message(field)
+                stack.append((parent, pos, end))
+                stack.append((field, field.start, field.end))
+            elif pause:
+                stack.append((parent, pos, end))
+            else:
+                continue
+
+            if pause:
+                n = 0
+                yield
+            break
+        else:
+            if parent is not root:
+                r.end_message(parent)
+
+
+# Decode the top-level fields in `buf`, the remainder that exceeds
+# the field budget or the timeout of `ctx.limits` is appended as bytes
+def decode_top_level(ctx: Context, buf: memoryview, index=None) -> List[Field]:
+    end = ctx.top_level_end(buf, 0, len(buf))
+
+    ret = decode_all_fields(ctx, None, buf, 0, end, index)
+
+    if ctx.stopped_at is not None:
+        end = ctx.stopped_at
+    if end < len(buf):
+        ret.append(ctx.remainder(buf, end, len(buf)))
+
+    return ret
+
+
+# The streaming counterpart of `decode_top_level`
+def stream_top_level(ctx: Context, r: StreamRenderer, buf: memoryview):
+    for _ in iter_stream_top_level(ctx, r, buf):
+        pass
+
+
+# Same as `stream_top_level`, but pauses like `iter_stream_fields`
+def iter_stream_top_level(ctx: Context, r: StreamRenderer, buf: memoryview, chunk_fields=0):
+    end = ctx.top_level_end(buf, 0, len(buf))
+
+    yield from iter_stream_fields(ctx, r, None, buf, 0, end, chunk_fields)
+
+    if ctx.stopped_at is not None:
+        end = ctx.stopped_at
+    if end < len(buf):
+        r.on_field(ctx.remainder(buf, end, len(buf)))
+
+
+# Decode `data` to a list of top-level fields,
+# `index`: an optional dict to be filled with id -> field/RepeatedField
+# `limits`: optional budgets, see `Limits`
+def parse(
+    data: bytes,
+    str_decoder=detect_multi_charset,
+    lazy=False,
+    policy=DecodePolicy.StrFirst,
+    index=None,
+    limits: Limits = None,
+) -> List[Field]:
+    buf = memoryview(data)
+
+    ctx = Context(str_decoder=str_decoder, lazy=lazy, policy=policy, limits=limits)
 
-        items = list(group)
+    ret = decode_top_level(ctx, buf, index)
 
-        if len(items) == 1:  # single field
-            ret.append(items[0])
-        else:  # repeated fields
-            repeated = RepeatedField(items)
-            repeated.idtype = items[0].idtype
-            repeated.parent = items[0].parent
-            ret.append(repeated)
+    # the timeout only bounds `parse` itself, with `lazy` the fields are
+    # decoded later on access, they are not cut by an old deadline
+    if limits is not None:
+        ctx._deadline = None
 
     return ret
 
 
+# Render a field tree with a renderer that is both a `Renderer` and a
+# `StreamRenderer` without recursion: varint/fixed fields are rendered by
+# `Field.render` as usual, structs are pushed by `on_field`, `start_message`
+# and `end_message`, the items of a RepeatedField are rendered one by one.
+def walk_fields(fields: List[Field], r):
+    on_field = r.on_field
+
+    # (struct whose children are being rendered, or None, iterator of the fields)
+    stack = [(None, iter(fields))]
+
+    while stack:
+        struct, it = stack[-1]
+
+        for field in it:
+            t = type(field)
+
+            if t is Struct:
+                on_field(field)
+
+                if field.as_fields:
+                    r.start_message(field)
+                    stack.append((field, iter(field.as_fields)))
+                    break
+
+            elif t is RepeatedField:
+                stack.append((None, iter(field.items)))
+                break
+
+            else:
+                field.render(r)
+        else:
+            stack.pop()
+            if struct is not None:
+                r.end_message(struct)
+
+
+# Methods that `walk_fields` calls instead of, or to replace, the recursive ones
+_WALK_METHODS = (
+    "render_struct",
+    "render_repeated_fields",
+    "on_field",
+    "start_message",
+    "end_message",
+)
+
+
+# Whether `walk_fields` renders the same as `Field.render` with the renderer,
+# all the methods must come from a class that sets `StreamRenderer.walkable`
+def _walkable(renderer) -> bool:
+    if not isinstance(renderer, StreamRenderer):
+        return False
+
+    mro = type(renderer).__mro__
+    for name in _WALK_METHODS:
+        owner = next(c for c in mro if name in c.__dict__)
+        if not owner.__dict__.get("walkable", False):
+            return False
+
+    return True
+
+
+# Render fields with the renderer, return the renderer's result
+# Walkable renderers, eg: ConsoleRenderer, are driven by `walk_fields` instead
+# of the recursive `Field.render`, so deeply nested fields don't overflow
+# the python stack. Subclasses that override how structs or repeated fields
+# are rendered keep using `Field.render`, see `StreamRenderer.walkable`.
+def render(fields: List[Field], renderer=None):
+    if renderer == None:
+        renderer = ConsoleRenderer()
+
+    if _walkable(renderer):
+        walk_fields(fields, renderer)
+    else:
+        for ch in fields:
+            ch.render(renderer)
+
+    return renderer.build_result()
+
+
+# `stats`: an optional `Stats` to collect counters and timings, see `Stats`
+# `limits`: optional budgets, see `Limits`
 def dump(
     data: bytes,
     renderer=None,
     str_decoder=detect_multi_charset,
+    lazy=False,
+    policy=DecodePolicy.StrFirst,
+    streaming=False,
+    stats: Stats = None,
+    limits: Limits = None,
+):
+    if stats is not None:
+        return _dump_profiled(
+            data, renderer, str_decoder, lazy, policy, streaming, stats, limits
+        )
+
+    if streaming:  # render while decoding, without building the field tree
+        if renderer == None:
+            renderer = ConsoleRenderer()
+
+        buf = memoryview(data)
+        ctx = Context(str_decoder=str_decoder, lazy=True, policy=policy, limits=limits)
+
+        stream_top_level(ctx, renderer, buf)
+
+        return renderer.build_result()
+
+    fields = parse(data, str_decoder=str_decoder, lazy=lazy, policy=policy, limits=limits)
+
+    return render(fields, renderer)
+
+
+# Same as `dump`, but time each stage and count into `stats`
+def _dump_profiled(
+    data, renderer, str_decoder, lazy, policy, streaming, stats: Stats, limits
 ):
+    total = perf_counter()
+
     if renderer == None:
         renderer = ConsoleRenderer()
 
-    view = memoryview(data)
+    buf = memoryview(data)
+    ctx = _ProfilingContext(stats, str_decoder, lazy or streaming, policy, limits)
 
-    fields = decode_all_fields(str_decoder=str_decoder, parent=None, view=view)
+    if streaming:
+        start = perf_counter()
+        stream_top_level(ctx, renderer, buf)
+        result = renderer.build_result()
+        stats.add_time("stream", perf_counter() - start)
+    else:
+        start = perf_counter()
+        fields = decode_top_level(ctx, buf)
+        stats.add_time("parse", perf_counter() - start)
 
-    for ch in fields:
-        ch.render(renderer)
+        start = perf_counter()
+        result = render(fields, renderer)
+        stats.add_time("render", perf_counter() - start)
 
-    return renderer.build_result()
+    stats.dumps += 1
+    stats.bytes += len(buf)
+    stats.add_time("total", perf_counter() - total)
+
+    return result
+
+
+# Same as `dump`, but decode the file directly from a read-only memory map,
+# without reading the whole file into memory.
+# Pipes, devices and empty files can't be mapped, they are read as usual.
+def dump_file(
+    path: str,
+    renderer=None,
+    str_decoder=detect_multi_charset,
+    lazy=False,
+    policy=DecodePolicy.StrFirst,
+    streaming=False,
+    stats: Stats = None,
+    limits: Limits = None,
+):
+    with open(path, "rb") as f:
+        st = os.fstat(f.fileno())
+        if not stat.S_ISREG(st.st_mode) or st.st_size == 0:
+            data = f.read()
+            return dump(data, renderer, str_decoder, lazy, policy, streaming, stats, limits)
+
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    try:
+        return dump(mm, renderer, str_decoder, lazy, policy, streaming, stats, limits)
+    finally:
+        try:
+            mm.close()
+        except BufferError:  # still referenced by some field, leave it to gc
+            pass
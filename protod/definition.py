@@ -7,6 +7,28 @@ class WireType:
     Fixed32 = 5
 
 
+# The order of decoding a length-delimited field as string and as child fields
+class DecodePolicy:
+    # always detect the charset, then try to decode it as child fields
+    StrFirst = 0
+    # try to decode it as child fields first, only detect the charset if
+    # it's not child fields, or it looks like a printable string
+    FieldsFirst = 1
+
+
+# Element types of packed repeated fields, see `Struct.as_packed`
+class PackedType:
+    Varint = "varint"  # uint32, uint64, bool
+    Int64 = "int64"  # int32, int64, enum, varint as two's complement
+    Sint64 = "sint64"  # sint32, sint64, zigzag varint
+    Fixed32 = "fixed32"
+    Sfixed32 = "sfixed32"
+    Float = "float"
+    Fixed64 = "fixed64"
+    Sfixed64 = "sfixed64"
+    Double = "double"
+
+
 def wire_type_str(t):
     if t == WireType.Varint:
         return "varint"
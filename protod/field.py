@@ -1,29 +1,36 @@
-import ctypes
+import struct
 from abc import ABC, abstractmethod
 
+from .packed import decode_packed
 from .renderer import Renderer
 
 
 class IdType:
-    def __init__(self, id, wire_type, idtype_bytes):
+    __slots__ = ("id", "wire_type", "raw_bytes")
+
+    # it's immutable, fields with the same id_type bytes share one instance
+    def __init__(self, id, wire_type, idtype_bytes: bytes):
         self.id = id
         self.wire_type = wire_type
         self.raw_bytes = idtype_bytes
 
 
+# Fields use `__slots__` and only store the raw value,
+# other forms like signed/float are computed on access.
 class Field(ABC):
+    __slots__ = ("idtype", "parent", "depth", "offset", "length")
+
     def __init__(self):
         self.idtype = None
         self.parent = None
+        self.depth = 0  # nesting level, 0 for top-level fields
 
-    def indent_level(self):
-        lvl = 0
-        p = self.parent
-        while p is not None:
-            lvl += 1
-            p = p.parent
+        # absolute position of the whole field(id_type + payload) in the input
+        self.offset = 0
+        self.length = 0
 
-        return lvl
+    def indent_level(self):
+        return self.depth
 
     @abstractmethod
     def render(self, r: Renderer):
@@ -31,34 +38,90 @@ class Field(ABC):
 
 
 class RepeatedField(Field):
+    __slots__ = ("items",)
+
     def __init__(self, items):
+        super().__init__()
+
         self.items = items
 
     def render(self, r: Renderer):
         r.render_repeated_fields(self)
 
 
+# Fill `index` with id -> field or RepeatedField of the decoded `fields`.
+# `fields` only groups adjacent fields with same id, here all the occurrences
+# of an id are merged to one RepeatedField, it only lives in the index,
+# its `offset`/`length` are the ones of the first occurrence.
+def index_fields(fields, index):
+    merged = set()  # ids whose RepeatedField is created here
+
+    for f in fields:
+        id = f.idtype.id
+        first = index.get(id)
+
+        if first is None:  # first occurrence
+            index[id] = f
+            continue
+
+        if id not in merged:  # don't modify the RepeatedField in `fields`
+            repeated = RepeatedField(
+                list(first.items) if type(first) is RepeatedField else [first]
+            )
+            repeated.idtype = first.idtype
+            repeated.parent = first.parent
+            repeated.depth = first.depth
+            repeated.offset = first.offset
+            repeated.length = first.length
+            index[id] = first = repeated
+            merged.add(id)
+
+        if type(f) is RepeatedField:
+            first.items.extend(f.items)
+        else:
+            first.items.append(f)
+
+
 class Varint(Field):
+    __slots__ = ("u64",)
+
     def __init__(self, u64):
         super().__init__()
 
-        # convert u64 -> i64
-        # i64 should be enough, no need for u64
         self.u64 = u64
-        self.i64 = ctypes.c_int64(u64).value
+
+    # convert u64 -> i64
+    # i64 should be enough, no need for u64
+    @property
+    def i64(self):
+        return self.u64 - (1 << 64) if self.u64 >= (1 << 63) else self.u64
 
     def render(self, r: Renderer):
         r.render_varint(self)
 
 
 class Fixed(Field):
-    def __init__(self, u, i, f):
+    __slots__ = ("u", "size")
+
+    # u: unsigned form
+    # size: 4 for fixed32/float, 8 for fixed64/double
+    def __init__(self, u, size):
         super().__init__()
 
-        # u: unsigned form
-        # i: signed form
-        # f: float form
-        self.u, self.i, self.f = u, i, f
+        self.u, self.size = u, size
+
+    # signed form
+    @property
+    def i(self):
+        bits = self.size * 8
+        return self.u - (1 << bits) if self.u >= (1 << (bits - 1)) else self.u
+
+    # float form
+    @property
+    def f(self):
+        if self.size == 4:
+            return struct.unpack("<f", struct.pack("<I", self.u))[0]
+        return struct.unpack("<d", struct.pack("<Q", self.u))[0]
 
     # displayed as:
     #   unsigned (signed if negative) (hex) (float)
@@ -67,13 +130,90 @@ class Fixed(Field):
 
 
 class Struct(Field):
+    __slots__ = ("buf", "start", "ctx", "_as_fields", "_as_str", "_index", "_has_fields")
 
-    def __init__(self, view: memoryview, as_str: bytes, encoding: str, is_str: bool):
+    # The payload is `buf[start:end]`, `start` and `end` are absolute offsets
+    # `as_fields` and `as_str` are decoded on first access and cached
+    def __init__(self, buf: memoryview, start: int, end: int, ctx):
         super().__init__()
 
-        self.view = view  # raw memoryview
-        self.as_fields = []  # this struc can be parsed to fields
-        self.as_str, self.encoding, self.is_str = as_str, encoding, is_str
+        self.buf, self.start = buf, start
+        self.ctx = ctx  # decode.Context
+
+        # the decoder extends it to the whole field, the payload shares the same end
+        self.offset, self.length = start, end - start
+
+        self._as_fields = None
+        self._as_str = None
+        self._index = None  # id -> field/RepeatedField, built by `get`
+        self._has_fields = None  # result of `ctx.has_children`, checked once
+
+    @property
+    def end(self) -> int:
+        return self.offset + self.length
+
+    # raw memoryview of the payload, created on demand
+    @property
+    def view(self) -> memoryview:
+        return self.buf[self.start : self.end]
+
+    # this struct can be parsed to fields
+    @property
+    def as_fields(self):
+        if self._as_fields is None:
+            self._as_fields = self.ctx.decode_children(self)
+        return self._as_fields
+
+    @as_fields.setter
+    def as_fields(self, fields):
+        self._as_fields = fields
+
+    # return the child field or RepeatedField with the id, or None
+    # O(1) after the first call
+    def get(self, id):
+        if self._index is None:
+            index = {}
+            if self._as_fields is None:  # build the index while decoding
+                self._as_fields = self.ctx.decode_children(self, index)
+            else:
+                index_fields(self._as_fields, index)
+            self._index = index
+
+        return self._index.get(id)
+
+    # whether it can be parsed to fields, without decoding them
+    @property
+    def has_fields(self) -> bool:
+        if self._as_fields is not None:
+            return bool(self._as_fields)
+
+        if self._has_fields is None:
+            self._has_fields = self.ctx.has_children(self)
+            if not self._has_fields:
+                self._as_fields = []
+        return self._has_fields
+
+    # (decoded string, encoding, is string)
+    def _decode_str(self):
+        if self._as_str is None:
+            self._as_str = self.ctx.decode_str(self)
+        return self._as_str
+
+    @property
+    def as_str(self):
+        return self._decode_str()[0]
+
+    @property
+    def encoding(self):
+        return self._decode_str()[1]
+
+    @property
+    def is_str(self):
+        return self._decode_str()[2]
+
+    # decode it as a packed repeated field of `packed_type`, see `decode_packed`
+    def as_packed(self, packed_type: str, use_numpy=True):
+        return decode_packed(self.view, packed_type, use_numpy)
 
     def render(self, r: Renderer):
         r.render_struct(self)
@@ -0,0 +1,122 @@
+from functools import lru_cache
+
+from .decode import dump
+from .definition import DecodePolicy, WireType
+from .renderer import Renderer, StreamRenderer
+from .util import detect_multi_charset
+
+
+# orjson is optional and imported on first use, return None if it's not installed
+@lru_cache(maxsize=None)
+def _orjson():
+    try:
+        import orjson
+
+        return orjson
+    except ImportError:
+        return None
+
+
+# Build a dict in one pass, eg:
+#   {1: 123, 2: "string", 3: {1: 1.5}, 4: [1, 2, 3], 5: "01 02 03"}
+#
+# - varint: signed int64
+# - fixed32/fixed64: signed int
+# - struct: a dict if it's child fields, a str if it's string,
+#           otherwise the hex string of the binary
+# - repeated fields: a list, also for repeated fields that are not adjacent
+#
+# Works in both normal and streaming mode.
+class JsonRenderer(Renderer, StreamRenderer):
+    walkable = True
+
+    def __init__(self):
+        self.result = dict()
+        self.stack = [self.result]  # the last one is the current message
+
+        self._last_message = None  # for `start_message`
+
+    def build_result(self):
+        return self.result
+
+    def _add(self, id, item):
+        current = self.stack[-1]
+
+        if id not in current:
+            current[id] = item
+        elif type(current[id]) is list:  # values are never list except for repeated fields
+            current[id].append(item)
+        else:
+            current[id] = [current[id], item]
+
+    def render_repeated_fields(self, repeated):
+        for ch in repeated.items:
+            ch.render(self)
+
+    def render_varint(self, varint):
+        self._add(varint.idtype.id, varint.i64)
+
+    def render_fixed(self, fixed):
+        self._add(fixed.idtype.id, fixed.i)
+
+    def render_struct(self, struct):
+        if struct.as_fields:
+            self.on_field(struct)
+            self.start_message(struct)
+            for ch in struct.as_fields:
+                ch.render(self)
+            self.end_message(struct)
+        else:
+            self.on_field(struct)
+
+    def on_field(self, field):
+        if field.idtype.wire_type != WireType.Struct:
+            field.render(self)
+        elif field.has_fields:
+            self._last_message = {}
+            self._add(field.idtype.id, self._last_message)
+        elif field.is_str:
+            self._add(field.idtype.id, field.as_str)
+        else:
+            self._add(field.idtype.id, field.view.hex(" "))
+
+    def start_message(self, struct):
+        self.stack.append(self._last_message)
+
+    def end_message(self, struct):
+        self.stack.pop()
+
+
+# Serialize the result of `JsonRenderer` to a json string,
+# `orjson` is used if it's installed
+def to_json(result, indent=False) -> str:
+    orjson = _orjson()
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(result, option=option).decode()
+
+    import json
+
+    return json.dumps(result, ensure_ascii=False, indent=2 if indent else None)
+
+
+# Dump each payload to a json object, and write them to the text file object
+# line by line, aka: JSON Lines
+def dump_jsonl(
+    payloads,
+    fileobj,
+    str_decoder=detect_multi_charset,
+    policy=DecodePolicy.StrFirst,
+):
+    for data in payloads:
+        result = dump(
+            data,
+            JsonRenderer(),
+            str_decoder=str_decoder,
+            policy=policy,
+            streaming=True,
+        )
+        fileobj.write(to_json(result))
+        fileobj.write("\n")
@@ -0,0 +1,22 @@
+# Budgets of a single `dump`, to bound the cost of hostile or unlucky input,
+# eg: binary data that happens to parse as deeply nested messages.
+# `None` means no limit.
+#
+# When a budget runs out, the decoding degrades instead of failing:
+#   max_depth: messages nested deeper than this are shown as bytes,
+#     the top-level fields are at depth 0
+#   max_fields: total number of decoded fields, a child message that exceeds
+#     the remaining budget is shown as bytes, the undecoded remainder of
+#     the top-level fields is shown as bytes with field number 0
+#   max_detect_bytes: total bytes sent to the str_decoder,
+#     strings after that are shown as bytes
+#   timeout: seconds, after that no more child messages are decoded,
+#     no more strings are detected, and the remainder of the top-level fields
+#     is shown as bytes with field number 0. With `parse(lazy=True)` it only
+#     bounds `parse` itself, fields accessed after it returns are not limited
+class Limits:
+    def __init__(self, max_depth=None, max_fields=None, max_detect_bytes=None, timeout=None):
+        self.max_depth = max_depth
+        self.max_fields = max_fields
+        self.max_detect_bytes = max_detect_bytes
+        self.timeout = timeout
@@ -1,75 +1,230 @@
 import sys
+import os
 import re
 import argparse
-import protod 
+import functools
+import protod
 from termcolor import cprint
 
-parser = argparse.ArgumentParser()
-parser.add_argument('--file', type=str, help='file path that contains proto data')
-parser.add_argument('--hex', action='store_true', help='content is hex string, eg: "080102..."')
-parser.add_argument('--b64', action='store_true', help='content is base64')
-parser.add_argument('--max_bin', metavar='n', type=int, default=32, help='binary exceeds `n` bytes is truncated and followed by a "..."')
-parser.add_argument('rest', help='hex string to parse, eg: "08 01..."', nargs=argparse.REMAINDER)
-
-args = parser.parse_args()
-
-proto = bytes()
+def new_parser():
+    parser = argparse.ArgumentParser(prog='protod')
+    parser.add_argument('--file', type=str, help='file path that contains proto data')
+    parser.add_argument('--hex', action='store_true', help='content is hex string, eg: "080102..."')
+    parser.add_argument('--b64', action='store_true', help='content is base64')
+    parser.add_argument('--max_bin', metavar='n', type=int, default=32, help='binary exceeds `n` bytes is truncated and followed by a "..."')
+    parser.add_argument('--fields_first', action='store_true', help='try decoding as child fields before detecting string, faster with deeply nested data')
+    parser.add_argument('--framing', choices=[protod.Framing.Varint, protod.Framing.Grpc], help='the --file is a stream of length-delimited messages, decode them one by one')
+    parser.add_argument('--batch', metavar='path', type=str, help='a directory of proto files, or a file of newline-delimited hex(or base64 with --b64) payloads, decoded in parallel')
+    parser.add_argument('--workers', metavar='n', type=int, default=None, help='number of processes for --batch, default: number of cpus')
+    parser.add_argument('--chunksize', metavar='n', type=int, default=1, help='number of payloads sent to a worker at a time for --batch')
+    parser.add_argument('--json', action='store_true', help='output json instead, one json per line for --framing and --batch')
+    parser.add_argument('--stats', action='store_true', help='print decoding counters and timings to stderr')
+    parser.add_argument('rest', help='hex string to parse, eg: "08 01..."', nargs=argparse.REMAINDER)
+    return parser
 
 # clear all ' \t\n\r' of an str
 def cleanup(s) -> str:
     if type(s) == bytes:
-        return re.sub(r'[\n\r\t ]+', '', s.decode()) 
+        return re.sub(r'[\n\r\t ]+', '', s.decode())
     return re.sub(r'[\n\r\t ]+', '', s)
 
-if args.file is not None: # get proto from file
+# the renderer writes to stdout directly, except for json
+def new_renderer(args):
+    if args.json:
+        return protod.JsonRenderer()
+    return protod.ConsoleRenderer(truncate_after=args.max_bin, out=sys.stdout)
+
+# print the remaining result of the renderer
+def print_result(args, result, indent=True):
+    if args.json:
+        print(protod.to_json(result, indent=indent))
+    else:
+        print()
+
+# print the collected stats to stderr
+def print_stats(stats):
+    if stats is not None:
+        print(stats, file=sys.stderr)
+
+def decode_policy(args):
+    return protod.DecodePolicy.FieldsFirst if args.fields_first else protod.DecodePolicy.StrFirst
+
+# decode multiple payloads in parallel
+def dump_batch(args):
+    names, payloads = [], []
     try:
-        f = open(args.file, "rb")
-        proto = f.read()
-        f.close()
+        if os.path.isdir(args.batch): # each file is a raw proto
+            for name in sorted(os.listdir(args.batch)):
+                path = os.path.join(args.batch, name)
+                if os.path.isfile(path):
+                    with open(path, "rb") as f:
+                        names.append(name)
+                        payloads.append(f.read())
+        else: # each line is a hex/base64 payload
+            with open(args.batch, "r") as f:
+                for line_no, line in enumerate(f, 1):
+                    line = cleanup(line)
+                    if line:
+                        names.append(f'line {line_no}')
+                        payloads.append(line)
     except:
-        cprint(f'failed to read file: {args.file}', 'red')
+        cprint(f'failed to read: {args.batch}', 'red')
         sys.exit(1)
 
-    if args.b64 or args.hex:
-        proto = cleanup(proto)
-else: # get proto from arguments
-    if len(args.rest) == 0:
-        cprint(f'no input', 'red')
-        parser.print_help()
-        sys.exit(1)
+    if not os.path.isdir(args.batch):
+        try:
+            if args.b64:
+                import base64
+                payloads = [base64.b64decode(p) for p in payloads]
+            else:
+                payloads = [bytes.fromhex(p) for p in payloads]
+        except:
+            cprint(f'invalid {"b64" if args.b64 else "hex"} data in: {args.batch}', 'red')
+            sys.exit(1)
 
-    if len(args.rest) > 1: # multiple rest arguments, eg: pro 0a 08 01 ...
-        # concat them together
-        proto = cleanup(''.join(args.rest))
+    if args.json:
+        renderer_factory = protod.JsonRenderer
     else:
-        # single rest argument, eg: pro "0a 08 01 ..."
-        proto = cleanup(args.rest[0])
+        renderer_factory = functools.partial(protod.ConsoleRenderer, truncate_after=args.max_bin)
+
+    results = protod.dump_many(
+        payloads,
+        renderer_factory,
+        workers=args.workers,
+        chunksize=args.chunksize,
+        lazy=True,
+        policy=decode_policy(args),
+    )
+    for name, s in zip(names, results):
+        if args.json:
+            print(protod.to_json(s))
+        else:
+            cprint(f'# {name}', 'light_grey')
+            print(s)
+
+# decode a stream of messages from file
+def dump_framing(args):
+    if args.file is None:
+        cprint(f'--framing requires --file', 'red')
+        sys.exit(1)
+
+    try:
+        f = open(args.file, "rb")
+    except:
+        cprint(f'failed to read file: {args.file}', 'red')
+        sys.exit(1)
+
+    with f:
+        messages = protod.iter_messages(f, framing=args.framing, lazy=True, policy=decode_policy(args))
+        for i, fields in enumerate(messages):
+            if not args.json:
+                cprint(f'# message {i}', 'light_grey')
+            print_result(args, protod.render(fields, new_renderer(args)), indent=False)
 
-# the proto should've already been cleaned up
-if args.b64:
+# decode raw proto from the file, memory mapped if it's a regular file
+def dump_mapped_file(args):
     try:
-        import base64
-        proto = base64.b64decode(proto)
+        open(args.file, "rb").close()
     except:
-        cprint(f'invalid b64 data', 'red')
+        cprint(f'failed to read file: {args.file}', 'red')
         sys.exit(1)
 
-if type(proto) == str and re.match(r'^([0-9A-Fa-f]+)$', proto):
-    args.hex = True
+    stats = protod.Stats() if args.stats else None
+
+    # output is written to stdout while decoding
+    result = protod.dump_file(
+        args.file,
+        new_renderer(args),
+        policy=decode_policy(args),
+        streaming=True,
+        stats=stats,
+    )
+    print_result(args, result)
+    print_stats(stats)
+
+# get proto from a hex/b64 file, or from arguments
+def read_proto(args, parser):
+    proto = bytes()
+
+    if args.file is not None: # get proto from file
+        try:
+            f = open(args.file, "rb")
+            proto = f.read()
+            f.close()
+        except:
+            cprint(f'failed to read file: {args.file}', 'red')
+            sys.exit(1)
+
+        if args.b64 or args.hex:
+            proto = cleanup(proto)
+    else: # get proto from arguments
+        if len(args.rest) == 0:
+            cprint(f'no input', 'red')
+            parser.print_help()
+            sys.exit(1)
+
+        if len(args.rest) > 1: # multiple rest arguments, eg: pro 0a 08 01 ...
+            # concat them together
+            proto = cleanup(''.join(args.rest))
+        else:
+            # single rest argument, eg: pro "0a 08 01 ..."
+            proto = cleanup(args.rest[0])
+
+    # the proto should've already been cleaned up
+    if args.b64:
+        try:
+            import base64
+            proto = base64.b64decode(proto)
+        except:
+            cprint(f'invalid b64 data', 'red')
+            sys.exit(1)
+
+    if type(proto) == str and re.match(r'^([0-9A-Fa-f]+)$', proto):
+        args.hex = True
+
+    if args.hex:
+        proto = bytes.fromhex(proto)
+
+    return proto
+
+# the `protod` command
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv[1:]
+
+    if argv[:1] == ['serve']: # protod serve ...
+        from protod import server
+        server.main(argv[1:])
+        return
+
+    parser = new_parser()
+    args = parser.parse_args(argv)
+
+    if args.batch is not None:
+        dump_batch(args)
+        return
+
+    if args.framing is not None:
+        dump_framing(args)
+        return
+
+    if args.file is not None and not (args.b64 or args.hex):
+        dump_mapped_file(args)
+        return
 
-if args.hex:
-    proto = bytes.fromhex(proto)
+    proto = read_proto(args, parser)
 
-s = protod.dump(
-    proto, 
-    protod.ConsoleRenderer(
-        truncate_after=args.max_bin
-   )
-)
-print(s)
+    stats = protod.Stats() if args.stats else None
 
-# Just a workaround for `pip install`
-# the `protod = 'protod.main:dummy'` in pyproject.toml needs to call a function 
-def dummy():
-    pass
+    result = protod.dump(
+        proto,
+        new_renderer(args),
+        policy=decode_policy(args),
+        streaming=True,
+        stats=stats,
+    )
+    print_result(args, result)
+    print_stats(stats)
 
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+import sys
+from array import array
+from functools import lru_cache
+
+from .definition import PackedType
+
+# PackedType -> (array typecode, numpy dtype)
+_FIXED_TYPES = {
+    PackedType.Fixed32: ("I", "<u4"),
+    PackedType.Sfixed32: ("i", "<i4"),
+    PackedType.Float: ("f", "<f4"),
+    PackedType.Fixed64: ("Q", "<u8"),
+    PackedType.Sfixed64: ("q", "<i8"),
+    PackedType.Double: ("d", "<f8"),
+}
+
+
+# numpy is optional, return None if it's not installed
+@lru_cache(maxsize=None)
+def _numpy():
+    try:
+        import numpy
+
+        return numpy
+    except ImportError:
+        return None
+
+
+# Decode all varints in the bytes to an array('Q')
+def _decode_varints(data: bytes) -> array:
+    if data.isascii():  # all 1 byte varints, one value per byte
+        return array("Q", list(data))
+
+    ret = array("Q")
+    append = ret.append
+
+    result = 0
+    shift = 0
+    for b in data:
+        if b < 0x80:
+            append((result | (b << shift)) & 0xFFFFFFFFFFFFFFFF)  # masked like `decode_varint`
+            result = 0
+            shift = 0
+        else:
+            result |= (b & 0x7F) << shift
+            shift += 7
+            if shift >= 64:
+                raise Exception("too many bytes when decoding packed varint")
+
+    if shift:
+        raise Exception("truncated packed varint")
+
+    return ret
+
+
+# Decode a packed repeated field to a typed array,
+# numpy.ndarray is returned if numpy is installed and `use_numpy` is True,
+# otherwise array.array
+def decode_packed(view: memoryview, packed_type: str, use_numpy=True):
+    np = _numpy() if use_numpy else None
+
+    if packed_type in _FIXED_TYPES:
+        typecode, dtype = _FIXED_TYPES[packed_type]
+
+        size = array(typecode).itemsize
+        if len(view) % size != 0:
+            raise Exception(f"length {len(view)} is not a multiple of {size}")
+
+        if np is not None:
+            return np.frombuffer(view, dtype=dtype)
+
+        ret = array(typecode, view.tobytes())
+        if sys.byteorder == "big":  # it's little endian in protobuf
+            ret.byteswap()
+        return ret
+
+    if packed_type not in (PackedType.Varint, PackedType.Int64, PackedType.Sint64):
+        raise Exception(f"Unknown packed type: {packed_type}")
+
+    u64s = _decode_varints(view.tobytes())
+
+    if np is not None:
+        u64s = np.frombuffer(u64s, dtype="=u8")
+        if packed_type == PackedType.Int64:
+            return u64s.view("=i8")
+        if packed_type == PackedType.Sint64:
+            return (u64s >> 1).view("=i8") ^ -(u64s & 1).view("=i8")
+        return u64s
+
+    if packed_type == PackedType.Int64:
+        return array("q", u64s.tobytes())
+    if packed_type == PackedType.Sint64:
+        return array("q", [(n >> 1) ^ -(n & 1) for n in u64s])
+    return u64s
@@ -0,0 +1,90 @@
+from typing import Iterator, List, Union
+
+from .decode import Context, decode_1_field, is_valid_fields, skip_1_field
+from .definition import DecodePolicy, WireType
+from .field import Field
+from .util import detect_multi_charset
+
+
+# A compiled field path like "3.7.2", which means:
+#   field 2 in field 7 in top-level field 3
+#
+# Fields that are not on the path are skipped by their length, without being
+# decoded or charset-detected, the search stops as soon as the target is found.
+class Path:
+    def __init__(self, path: Union[str, List[int]]):
+        if isinstance(path, str):
+            path = path.split(".")
+        try:
+            self.ids = [int(id) for id in path]
+        except ValueError:
+            raise Exception(f"invalid path: {path}")
+
+        if not self.ids or any(id < 0 for id in self.ids):
+            raise Exception(f"invalid path: {path}")
+
+    # Return the first matched field, or `default` if not found,
+    # strings and child fields of the returned field are decoded lazily.
+    def get(
+        self,
+        data: bytes,
+        default=None,
+        str_decoder=detect_multi_charset,
+        policy=DecodePolicy.StrFirst,
+    ) -> Field:
+        return next(self.find_all(data, str_decoder, policy), default)
+
+    # Yield all matched fields in order, eg: all items of a repeated field
+    def find_all(
+        self,
+        data: bytes,
+        str_decoder=detect_multi_charset,
+        policy=DecodePolicy.StrFirst,
+    ) -> Iterator[Field]:
+        buf = memoryview(data)
+        ctx = Context(str_decoder=str_decoder, lazy=True, policy=policy)
+
+        yield from self._find(ctx, None, buf, 0, len(buf), 0)
+
+    # Search `self.ids[level]` in `buf[start:end]`,
+    # stop at invalid data, which means it's not a message
+    def _find(self, ctx, parent, buf, start, end, level) -> Iterator[Field]:
+        target = self.ids[level]
+        is_last = level == len(self.ids) - 1
+
+        pos = start
+        while pos < end:
+            field_start = pos
+
+            id_type, pos = skip_1_field(buf, pos, end)
+            if pos < 0:
+                return
+
+            if (id_type >> 3) != target:
+                continue
+
+            if is_last:
+                field, _ = decode_1_field(ctx, parent, buf, field_start, end)
+                yield field
+            elif id_type & 7 == WireType.Struct:
+                field, _ = decode_1_field(ctx, parent, buf, field_start, end)
+
+                # only descend into valid messages, like `dump` does,
+                # a string or bytes field is not searched
+                if not is_valid_fields(buf, field.start, field.end):
+                    continue
+
+                yield from self._find(ctx, field, buf, field.start, field.end, level + 1)
+
+
+# Return the first field at `path`, eg: "3.7.2", or `default` if not found
+def get(
+    data: bytes,
+    path: Union[str, List[int], Path],
+    default=None,
+    str_decoder=detect_multi_charset,
+    policy=DecodePolicy.StrFirst,
+) -> Field:
+    if not isinstance(path, Path):
+        path = Path(path)
+    return path.get(data, default, str_decoder, policy)
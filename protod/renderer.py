@@ -1,9 +1,8 @@
+import io
 from abc import ABC, abstractmethod
 from html import escape
 
-from termcolor import colored
-
-from .definition import wire_type_str
+from .definition import WireType, wire_type_str
 
 
 # Field formatter and colorizer
@@ -36,17 +35,75 @@ class Renderer(ABC):
         pass
 
 
-class ConsoleRenderer(Renderer):
+# The streaming counterpart of `Renderer`, used by `dump(..., streaming=True)`
+# The decoder pushes fields to it while decoding, the field tree is never built:
+#   on_field(a)
+#   on_field(b)      <- a struct that contains child fields
+#   start_message(b)
+#     on_field(c)    <- child fields of b
+#   end_message(b)
+#   on_field(d)
+# Repeated fields are not grouped, each item is pushed as a single field.
+# `render` also uses it to walk a field tree without recursion, for renderers
+# that implement both and set `walkable`, see `decode.walk_fields`.
+class StreamRenderer(ABC):
+    # Set to True by a class whose `render_struct`/`render_repeated_fields`
+    # produce the same output as `on_field`/`start_message`/`end_message`,
+    # it only applies to the methods defined by that class, a subclass that
+    # overrides any of them is rendered with `Field.render` recursively.
+    walkable = False
+
+    # same as `Renderer.build_result`
+    @abstractmethod
+    def build_result(self):
+        pass
+
+    # a varint/fixed/struct is decoded,
+    # for struct, use `struct.has_fields` instead of `struct.as_fields`,
+    # the child fields are pushed after `start_message`
+    @abstractmethod
+    def on_field(self, field):
+        pass
+
+    # the following fields are children of the struct
+    @abstractmethod
+    def start_message(self, struct):
+        pass
+
+    # all children of the struct are pushed
+    @abstractmethod
+    def end_message(self, struct):
+        pass
+
+
+class ConsoleRenderer(Renderer, StreamRenderer):
+    walkable = True
+
     # Long binary data that exceeds `n` bytes is truncated and followed by a '...'
     # use a large value like 1000000 to 'not' truncate
     # default: 32
-    def __init__(self, truncate_after=32, no_color=False):
-        self.cells = []
+    #
+    # `out`: a file-like object, eg: sys.stdout, the output is written to it directly
+    # instead of being buffered, and `build_result` returns ""
+    def __init__(self, truncate_after=32, no_color=False, out=None):
         self.truncate_after = truncate_after
         self.no_color = no_color
 
+        self.out = out if out is not None else io.StringIO()
+        self._write = self.out.write
+
+        # ansi (prefix, suffix) of each color
+        self._idtype_style = self._style("light_red")
+        self._id_style = self._style("light_green")
+        self._type_style = self._style("yellow")
+        self._num_style = self._style("light_cyan")
+        self._str_style = self._style("light_blue")
+        self._bin_style = self._style("light_yellow")
+
     def build_result(self):
-        return "".join(self.cells)
+        if isinstance(self.out, io.StringIO):
+            return self.out.getvalue()
+        return ""
 
     def render_repeated_fields(self, repeated):
         for ch in repeated.items:
@@ -75,12 +132,35 @@ class ConsoleRenderer(Renderer):
         self._add_newline()
 
     def render_struct(self, struct):
+        self._render_struct_head(struct)
+
+        # show as child struct
+        if struct.as_fields:
+            for ch in struct.as_fields:
+                ch.render(self)
+
+    def on_field(self, field):
+        if field.idtype.wire_type == WireType.Struct:
+            self._render_struct_head(field)
+        else:
+            field.render(self)
+
+    def start_message(self, struct):
+        pass
+
+    def end_message(self, struct):
+        pass
+
+    ###########################
+
+    # everything of a struct except its child fields
+    def _render_struct_head(self, struct):
         self._render_idtype(struct.indent_level(), struct.idtype)
 
         self._add_normal(f"({str(len(struct.view))}) ")
 
         if struct.is_str:
-            if struct.as_fields:
+            if struct.has_fields:
                 if struct.as_str.isprintable():
                     self._render_str(struct.as_str, struct.encoding)
                     self._add_newline()
@@ -97,23 +177,18 @@ class ConsoleRenderer(Renderer):
                 self._add_newline()
 
         else:
-            if not struct.as_fields:
+            if not struct.has_fields:
                 # show as binary
                 self._add_bin(struct.view)
                 self._add_newline()
 
-        # 2. show as child struct
-        if struct.as_fields:
+        if struct.has_fields:
             self._add_newline()
-            for ch in struct.as_fields:
-                ch.render(self)
-
-    ###########################
 
     def _render_idtype(self, indent_level, idtype):
         self._add_indent(indent_level)
         self._add_normal("[")
-        self._add_idtype(" ".join(format(x, "02x") for x in idtype.raw_bytes))
+        self._add_idtype(idtype.raw_bytes.hex(" "))
         self._add_normal("] ")
         self._add_id(str(idtype.id) + " ")
         self._add_type(wire_type_str(idtype.wire_type))
@@ -128,8 +203,16 @@ class ConsoleRenderer(Renderer):
         self._add_str(string)
 
     def _add(self, cell):
-        self.cells.append(cell)
-        pass
+        self._write(cell)
+
+    def _style(self, color):
+        from termcolor import colored
+
+        prefix, _, suffix = colored("\0", color, no_color=self.no_color).partition("\0")
+        return prefix, suffix
+
+    def _add_styled(self, style, s):
+        self._add(f"{style[0]}{s}{style[1]}")
 
     def _add_indent(self, level):
         self._add(" " * 4 * level)
@@ -138,28 +221,60 @@ class ConsoleRenderer(Renderer):
         self._add(s)
 
     def _add_idtype(self, s):
-        self._add(colored(s, "light_red", no_color=self.no_color))
+        self._add_styled(self._idtype_style, s)
 
     def _add_id(self, s):
-        self._add(colored(s, "light_green", no_color=self.no_color))
+        self._add_styled(self._id_style, s)
 
     def _add_type(self, s):
-        self._add(colored(s, "yellow", no_color=self.no_color))
+        self._add_styled(self._type_style, s)
 
     def _add_num(self, s):
-        self._add(colored(s, "light_cyan", no_color=self.no_color))
+        self._add_styled(self._num_style, s)
 
     def _add_str(self, s):
-        self._add(colored(s, "light_blue", no_color=self.no_color))
+        self._add_styled(self._str_style, s)
 
     def _add_bin(self, s):
-        truncated = s[: self.truncate_after]
-        self._add(
-            colored(
-                " ".join(format(x, "02x") for x in truncated),
-                "light_yellow",
-                no_color=self.no_color,
-            )
-        )
+        self._add_styled(self._bin_style, s[: self.truncate_after].hex(" "))
         if len(s) > self.truncate_after:
             self._add_normal(" ...")
+
+
+# The HtmlRenderer builds a full html div string,
+# which can be simply set to a <div>
+#
+# usage:
+#
+#  html_tag = protod.dump(proto, protod.HtmlRenderer())
+#  send the html_tag to client browser
+#  $('#div').text(html_tag)
+#
+class HtmlRenderer(ConsoleRenderer):
+
+    def _add_indent(self, level):
+        self._add("&nbsp;" * 4 * level)
+
+    def _add_newline(self):
+        self._add("</br>")
+
+    def _add_normal(self, s):
+        self._add(s)
+
+    def _add_idtype(self, s):
+        self._add(f"<font color='#ff2200'>{s}</font>")
+
+    def _add_id(self, s):
+        self._add(f"<font color='#00ff11'>{s}</font>")
+
+    def _add_type(self, s):
+        self._add(f"<font color='#808000'>{s}</font>")
+
+    def _add_num(self, s):
+        self._add(f"<font color='cyan'>{s}</font>")
+
+    def _add_str(self, s):
+        self._add(f"<font color='blue'>{escape(s)}</font>")
+
+    def _add_bin(self, s):
+        self._add(f"<font color='yellow'>{escape(s.hex(' '))}</font>")
@@ -0,0 +1,194 @@
+import argparse
+import asyncio
+import base64
+import multiprocessing
+import os
+import stat
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+from .decode import dump
+from .definition import DecodePolicy
+from .json_renderer import JsonRenderer, to_json
+from .renderer import ConsoleRenderer, HtmlRenderer
+
+# Decoding server, a warm process that avoids the startup cost of the cli.
+#
+# It speaks plain HTTP, over tcp or a unix socket:
+#   POST /?format=console&input=hex
+#   <payload as body>
+#
+# query parameters:
+#   format: console(default), json, html
+#   input: raw(default), hex, b64
+#   max_bin: same as the cli `--max_bin`, for console format
+#   color: 1 to keep the ansi colors, for console format
+#   fields_first: 1 to use `DecodePolicy.FieldsFirst`
+#
+# eg:
+#   curl --data-binary @pb.bin 'http://127.0.0.1:8780/?format=json'
+#   curl --unix-socket /tmp/protod.sock --data '08 01' 'http://localhost/?input=hex'
+
+MAX_BODY = 64 * 1024 * 1024
+
+CONTENT_TYPES = {
+    "console": "text/plain; charset=utf-8",
+    "json": "application/json",
+    "html": "text/html; charset=utf-8",
+}
+
+
+# Runs in the worker processes, the charset cache of each worker stays warm
+# between requests.
+def _render(data: bytes, format: str, max_bin: int, color: bool, policy) -> str:
+    if format == "json":
+        return to_json(dump(data, JsonRenderer(), policy=policy, streaming=True))
+
+    if format == "html":
+        renderer = HtmlRenderer()
+    else:
+        renderer = ConsoleRenderer(truncate_after=max_bin, no_color=not color)
+
+    return dump(data, renderer, policy=policy, streaming=True)
+
+
+class Server:
+    def __init__(self, workers=None):
+        # Workers are started on demand, a forked worker would inherit the
+        # open client connections and keep them from closing,
+        # the forkserver starts them from a clean process,
+        # "spawn" is used where it's not available, eg: on Windows.
+        if "forkserver" in multiprocessing.get_all_start_methods():
+            method = "forkserver"
+        else:
+            method = "spawn"
+
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context(method)
+        )
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            status, content_type, body = await self._handle_request(reader)
+        except Exception as e:
+            status, content_type, body = 400, CONTENT_TYPES["console"], str(e)
+
+        body = body.encode()
+        writer.write(
+            (
+                f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\n"
+                f"Content-Type: {content_type}\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                "Connection: close\r\n"
+                "\r\n"
+            ).encode()
+            + body
+        )
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    # return (status code, content type, body)
+    async def _handle_request(self, reader: asyncio.StreamReader):
+        request_line = (await reader.readline()).decode("latin-1").split()
+        if len(request_line) != 3:
+            raise Exception("invalid request")
+        method, target, _ = request_line
+
+        content_length = 0
+        while True:
+            line = (await reader.readline()).decode("latin-1").strip()
+            if not line:
+                break
+            name, _, value = line.partition(":")
+            if name.strip().lower() == "content-length":
+                content_length = int(value)
+
+        if method != "POST":
+            raise Exception("only POST is supported")
+        if content_length > MAX_BODY:
+            raise Exception(f"body exceeds {MAX_BODY} bytes")
+
+        data = await reader.readexactly(content_length)
+
+        query = {k: v[-1] for k, v in parse_qs(urlsplit(target).query).items()}
+
+        format = query.get("format", "console")
+        if format not in CONTENT_TYPES:
+            raise Exception(f"unknown format: {format}")
+
+        input = query.get("input", "raw")
+        if input == "hex":
+            data = bytes.fromhex(data.decode())
+        elif input == "b64":
+            data = base64.b64decode(data)
+        elif input != "raw":
+            raise Exception(f"unknown input: {input}")
+
+        try:
+            max_bin = int(query.get("max_bin", 32))
+        except ValueError:
+            raise Exception(f"invalid max_bin: {query['max_bin']}")
+
+        color = query.get("color") == "1"
+
+        policy = DecodePolicy.StrFirst
+        if query.get("fields_first") == "1":
+            policy = DecodePolicy.FieldsFirst
+
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(
+                self.executor, _render, data, format, max_bin, color, policy
+            )
+        except Exception as e:
+            return 422, CONTENT_TYPES["console"], f"failed to decode: {e}"
+
+        return 200, CONTENT_TYPES[format], result
+
+    def close(self):
+        self.executor.shutdown()
+
+
+# Serve on a unix socket if `unix_path` is set, otherwise on `host:port`
+async def serve(host="127.0.0.1", port=8780, unix_path=None, workers=None):
+    server = Server(workers)
+    created_socket = False  # only remove the socket created by this server
+    try:
+        if unix_path is not None:
+            # a socket left by a killed server
+            if _is_socket(unix_path):
+                os.remove(unix_path)
+            s = await asyncio.start_unix_server(server.handle, path=unix_path)
+            created_socket = True
+        else:
+            s = await asyncio.start_server(server.handle, host, port)
+
+        async with s:
+            await s.serve_forever()
+    finally:
+        server.close()
+        if created_socket and _is_socket(unix_path):
+            os.remove(unix_path)
+
+
+def _is_socket(path: str) -> bool:
+    try:
+        return stat.S_ISSOCK(os.lstat(path).st_mode)
+    except OSError:
+        return False
+
+
+# `protod serve ...`
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="protod serve")
+    parser.add_argument("--host", type=str, default="127.0.0.1", help="default: 127.0.0.1")
+    parser.add_argument("--port", type=int, default=8780, help="default: 8780")
+    parser.add_argument("--unix", metavar="path", type=str, help="serve on a unix socket instead of tcp")
+    parser.add_argument("--workers", metavar="n", type=int, default=None, help="number of decoding processes, default: number of cpus")
+    args = parser.parse_args(argv)
+
+    try:
+        asyncio.run(serve(args.host, args.port, args.unix, args.workers))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,75 @@
+from .definition import wire_type_str
+
+
+# Counters and timings collected while decoding, pass it to `dump(stats=...)`.
+# One `Stats` can be shared by many `dump` calls to aggregate them.
+# Decoding without it has no overhead, the counting is only done by
+# the profiling context created when `stats` is set.
+#
+# stages in `times`, in seconds:
+#   parse: building the field tree, including eager detecting/checking
+#   render: rendering the field tree, including lazy detecting/checking
+#   stream: decoding and rendering in streaming mode
+#   detect: the str_decoder
+#   check_children: checking whether a length-delimited field is a message
+#   total: the whole `dump`
+class Stats:
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.dumps = 0
+        self.bytes = 0  # input bytes
+
+        self.fields = {}  # wire type -> number of fields
+
+        # length-delimited fields speculatively checked as child messages,
+        # and the ones turned out not to be
+        self.child_checks = 0
+        self.failed_child_checks = 0
+
+        # detector -> bytes/calls, the detector is the one that made the decision:
+        #   "cache", "ascii", "utf-8", "chardet", "charset_normalizer", "empty",
+        #   or the function name of a custom str_decoder
+        self.detector_bytes = {}
+        self.detector_calls = {}
+
+        self.times = {}  # stage -> seconds
+
+    def add_time(self, stage: str, seconds: float):
+        self.times[stage] = self.times.get(stage, 0.0) + seconds
+
+    def add_detector(self, detector: str, n_bytes: int):
+        self.detector_bytes[detector] = self.detector_bytes.get(detector, 0) + n_bytes
+        self.detector_calls[detector] = self.detector_calls.get(detector, 0) + 1
+
+    # plain dict, for exporting to metrics systems
+    def to_dict(self) -> dict:
+        return {
+            "dumps": self.dumps,
+            "bytes": self.bytes,
+            "fields": {wire_type_str(t): n for t, n in sorted(self.fields.items())},
+            "child_checks": self.child_checks,
+            "failed_child_checks": self.failed_child_checks,
+            "detector_bytes": dict(self.detector_bytes),
+            "detector_calls": dict(self.detector_calls),
+            "times": dict(self.times),
+        }
+
+    def __str__(self):
+        lines = [f"dumps: {self.dumps}, bytes: {self.bytes}"]
+
+        for t, n in sorted(self.fields.items()):
+            lines.append(f"fields {wire_type_str(t)}: {n}")
+
+        lines.append(
+            f"child checks: {self.child_checks}, failed: {self.failed_child_checks}"
+        )
+
+        for d, n in self.detector_bytes.items():
+            lines.append(f"detector {d}: {n} bytes, {self.detector_calls[d]} calls")
+
+        for stage, seconds in self.times.items():
+            lines.append(f"time {stage}: {seconds * 1000:.3f} ms")
+
+        return "\n".join(lines)
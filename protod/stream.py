@@ -0,0 +1,94 @@
+import struct
+from typing import BinaryIO, Iterator, List
+
+from .decode import parse
+from .definition import DecodePolicy
+from .field import Field
+from .util import detect_multi_charset
+
+
+# How messages are separated in a stream
+class Framing:
+    # each message is prefixed with its length as a varint,
+    # eg: java's `writeDelimitedTo`, c++'s `SerializeDelimitedToOstream`
+    Varint = "varint"
+    # each message is prefixed with 5 bytes:
+    #   1 byte compressed flag + 4 bytes big-endian length
+    Grpc = "grpc"
+
+
+# Read exactly `n` bytes, raise if the stream ends before that
+def _read_exact(fileobj: BinaryIO, n: int) -> bytes:
+    data = fileobj.read(n)
+    if len(data) != n:
+        raise Exception(f"truncated message, expect {n} bytes, got {len(data)}")
+    return data
+
+
+# Read the varint length prefix, return None at the end of stream
+def _read_varint_prefix(fileobj: BinaryIO):
+    result = 0
+    shift = 0
+    while True:
+        b = fileobj.read(1)
+        if not b:
+            if shift == 0:  # end of stream
+                return None
+            raise Exception("truncated varint length prefix")
+
+        result |= (b[0] & 0x7F) << shift
+        if not (b[0] & 0x80):
+            return result
+
+        shift += 7
+        if shift >= 64:
+            raise Exception("too many bytes when decoding varint length prefix")
+
+
+def _read_varint_message(fileobj: BinaryIO):
+    msg_len = _read_varint_prefix(fileobj)
+    if msg_len is None:
+        return None
+    return _read_exact(fileobj, msg_len)
+
+
+def _read_grpc_message(fileobj: BinaryIO):
+    header = fileobj.read(5)
+    if not header:  # end of stream
+        return None
+    if len(header) != 5:
+        raise Exception("truncated grpc message header")
+
+    compressed, msg_len = struct.unpack(">BI", header)
+    data = _read_exact(fileobj, msg_len)
+
+    if compressed:  # gzip is the default grpc compression
+        import gzip
+
+        data = gzip.decompress(data)
+    return data
+
+
+# Read length-delimited messages from a binary file object one by one,
+# and yield the decoded top-level fields of each message.
+# Only one message is kept in memory at a time.
+def iter_messages(
+    fileobj: BinaryIO,
+    framing=Framing.Varint,
+    str_decoder=detect_multi_charset,
+    lazy=False,
+    policy=DecodePolicy.StrFirst,
+) -> Iterator[List[Field]]:
+    if framing == Framing.Varint:
+        read_message = _read_varint_message
+    elif framing == Framing.Grpc:
+        read_message = _read_grpc_message
+    else:
+        raise Exception(f"Unknown framing: {framing}")
+
+    while True:
+        data = read_message(fileobj)
+        if data is None:
+            return
+
+        yield parse(data, str_decoder=str_decoder, lazy=lazy, policy=policy)
@@ -1,5 +1,17 @@
-import chardet
-import charset_normalizer
+from functools import lru_cache
+
+# printable ascii and common whitespaces
+_PRINTABLE_ASCII = bytes(range(0x20, 0x7F)) + b"\t\n\r"
+# bytes that can appear in a text, control characters are excluded
+_TEXT = _PRINTABLE_ASCII + bytes(range(0x80, 0x100))
+
+# only short strings are cached, they are the most repeated ones,
+# eg: enum-like names, urls, locale strings
+CACHE_MAX_LEN = 1024
+CACHE_SIZE = 4096
+
+# `chardet` is used for bytes up to this length, `charset_normalizer` for longer ones
+CHARDET_MAX_LEN = 200
 
 
 # try to detect the encoding of an string
@@ -10,10 +22,63 @@ import charset_normalizer
 # )
 def detect_multi_charset(view) -> tuple[bytes, str, bool]:
     view_bytes = view.tobytes()
+
+    if len(view_bytes) <= CACHE_MAX_LEN:
+        return _detect_cached(view_bytes)
+
+    return _detect(view_bytes)
+
+
+# Same as `detect_multi_charset`, but also return the detector that made the decision,
+# it's slower and only used for profiling, see `Stats.detector_bytes`
+def detect_multi_charset_profiled(view) -> tuple[tuple[bytes, str, bool], str]:
+    view_bytes = view.tobytes()
+
+    if len(view_bytes) <= CACHE_MAX_LEN:
+        hits = _detect_cached.cache_info().hits
+        ret = _detect_cached(view_bytes)
+        if _detect_cached.cache_info().hits != hits:
+            return ret, "cache"
+    else:
+        ret = _detect(view_bytes)
+
+    return ret, _detector(view_bytes, ret)
+
+
+# Whether the bytes contain no control characters except common whitespaces
+def looks_like_text(view_bytes: bytes) -> bool:
+    return not view_bytes.translate(None, _TEXT)
+
+
+# The bytes object is hashed by its content, so same strings share one result
+@lru_cache(maxsize=CACHE_SIZE)
+def _detect_cached(view_bytes: bytes) -> tuple[bytes, str, bool]:
+    return _detect(view_bytes)
+
+
+def _detect(view_bytes: bytes) -> tuple[bytes, str, bool]:
+    if not view_bytes:  # nothing to detect
+        return view_bytes, "", False
+
+    # 1. pure ascii text
+    if not view_bytes.translate(None, _PRINTABLE_ASCII):
+        return view_bytes.decode("ascii"), "ascii", True
+
+    # 2. strict utf-8 text
+    if not view_bytes.isascii() and looks_like_text(view_bytes):
+        try:
+            return view_bytes.decode("utf-8"), "utf-8", True
+        except UnicodeDecodeError:
+            pass
+
+    # 3. fallback to the heavy detectors, they are slow to import, only import when needed
     try:
+        import chardet
+        import charset_normalizer
+
         # `chardet` is way more accurate, but very slow with large bytes(4 seconds on 50k bytes)
         # `charset_normalizer` shows wrong result with small bytes, but very performant with long bytes
-        if len(view_bytes) <= 200:
+        if len(view_bytes) <= CHARDET_MAX_LEN:
             detected = chardet.detect(view_bytes)
         else:
             detected = charset_normalizer.detect(view_bytes)
@@ -30,3 +95,18 @@ def detect_multi_charset(view) -> tuple[bytes, str, bool]:
         pass
 
     return view_bytes, "", False
+
+
+# Which step of `_detect` returned `ret` for the bytes, it follows the same order
+def _detector(view_bytes: bytes, ret) -> str:
+    if not view_bytes:
+        return "empty"
+
+    if not view_bytes.translate(None, _PRINTABLE_ASCII):
+        return "ascii"
+
+    # the strict utf-8 step returns before the heavy detectors if it succeeds
+    if ret[2] and ret[1] == "utf-8" and not view_bytes.isascii() and looks_like_text(view_bytes):
+        return "utf-8"
+
+    return "chardet" if len(view_bytes) <= CHARDET_MAX_LEN else "charset_normalizer"
@@ -0,0 +1,39 @@
+# Varint decoding, the innermost loop of decoding.
+#
+# `decode_varint(buf, pos) -> (value, new pos)`
+#   - buf: bytes/memoryview/mmap
+#   - raises IndexError if it exceeds the buffer, same as protobuf's `_DecodeVarint`
+#   - the value is masked to 64 bits
+#
+# The compiled `protod._varint` is used if it's built, otherwise the pure python one.
+
+
+# Pure python, with fast paths for 1 and 2 bytes varints, which are most of
+# the tags and small values.
+def _decode_varint(buf, pos: int) -> tuple[int, int]:
+    b = buf[pos]
+    if b < 0x80:
+        return b, pos + 1
+
+    b2 = buf[pos + 1]
+    if b2 < 0x80:
+        return (b & 0x7F) | (b2 << 7), pos + 2
+
+    result = (b & 0x7F) | ((b2 & 0x7F) << 7)
+    shift = 14
+    pos += 2
+    while True:
+        b = buf[pos]
+        pos += 1
+        result |= (b & 0x7F) << shift
+        if not (b & 0x80):
+            return result & 0xFFFFFFFFFFFFFFFF, pos
+        shift += 7
+        if shift >= 64:
+            raise Exception("Too many bytes when decoding varint.")
+
+
+try:
+    from ._varint import decode_varint
+except ImportError:
+    decode_varint = _decode_varint
@@ -1,4 +1,4 @@
-from setuptools import find_packages, setup
+from setuptools import Extension, find_packages, setup
 
 github = "https://github.com/aj3423/protod/"
 
@@ -9,7 +9,9 @@ setup(
     url=github,
     author="aj3423",
     packages=find_packages(),
-    install_requires=["chardet", "charset_normalizer", "protobuf", "termcolor"],
-    entry_points={"console_scripts": ["protod=protod.main:dummy"]},
+    install_requires=["chardet", "charset_normalizer", "termcolor"],
+    # optional, falls back to the pure python varint decoder if it fails to build
+    ext_modules=[Extension("protod._varint", ["protod/_varint.c"], optional=True)],
+    entry_points={"console_scripts": ["protod=protod.main:main"]},
     long_description="See: " + github,
 )
@@ -0,0 +1,74 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import protod
+from protod import ConsoleRenderer, JsonRenderer, Renderer
+
+DATA = bytes.fromhex("0a0568656c6c6f10011a0408021003")
+
+
+# a renderer that only implements `Renderer`, not `StreamRenderer`
+class IdRenderer(Renderer):
+    def __init__(self):
+        self.ids = []
+
+    def build_result(self):
+        return self.ids
+
+    def render_repeated_fields(self, repeated):
+        for ch in repeated.items:
+            ch.render(self)
+
+    def render_varint(self, varint):
+        self.ids.append(varint.idtype.id)
+
+    def render_fixed(self, fixed):
+        self.ids.append(fixed.idtype.id)
+
+    def render_struct(self, struct):
+        self.ids.append(struct.idtype.id)
+        for ch in struct.as_fields:
+            ch.render(self)
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_cooperative():
+    expected = protod.dump(DATA, ConsoleRenderer(no_color=True))
+    assert run(protod.dump_async(DATA, ConsoleRenderer(no_color=True))) == expected
+    assert run(protod.dump_async(DATA, JsonRenderer())) == protod.dump(DATA, JsonRenderer())
+
+
+def test_cooperative_yields():
+    data = DATA * 1000
+    expected = protod.dump(data, ConsoleRenderer(no_color=True), streaming=True)
+    result = run(protod.dump_async(data, ConsoleRenderer(no_color=True), time_slice=0))
+    assert result == expected
+
+
+def test_plain_renderer():
+    expected = protod.dump(DATA, IdRenderer())
+    assert expected == [1, 2, 3, 1, 2]
+    assert run(protod.dump_async(DATA, IdRenderer())) == expected
+
+
+def test_executor():
+    with ThreadPoolExecutor(1) as executor:
+        result = run(protod.dump_async(DATA, IdRenderer(), executor=executor))
+    assert result == protod.dump(DATA, IdRenderer())
+
+
+# overrides how repeated fields are rendered, it's not walkable
+class CountingRenderer(ConsoleRenderer):
+    def render_repeated_fields(self, repeated):
+        self._add_normal(f"{len(repeated.items)} items")
+        self._add_newline()
+
+
+def test_override():
+    data = bytes.fromhex("080108021003")
+    expected = protod.dump(data, CountingRenderer(no_color=True))
+    assert "2 items" in expected
+    assert run(protod.dump_async(data, CountingRenderer(no_color=True))) == expected
@@ -0,0 +1,131 @@
+import io
+import os
+from functools import partial
+
+import pytest
+
+import protod
+from protod import ConsoleRenderer, DumpCache, JsonRenderer
+
+DATA = bytes.fromhex("0a0568656c6c6f1001")
+
+plain = partial(ConsoleRenderer, no_color=True)
+
+
+def test_hit():
+    cache = DumpCache()
+    expected = protod.dump(DATA, plain())
+
+    assert cache.dump(DATA, plain) == expected
+    assert cache.dump(DATA, plain) == expected
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_settings_are_part_of_the_key():
+    cache = DumpCache()
+
+    truncated = partial(ConsoleRenderer, no_color=True, truncate_after=1)
+
+    assert cache.dump(DATA, plain) != cache.dump(DATA, truncated)
+    assert cache.dump(DATA, plain, policy=protod.DecodePolicy.FieldsFirst) == cache.dump(DATA, plain)
+    assert (cache.hits, cache.misses) == (1, 3)
+
+
+def test_result_is_a_copy():
+    cache = DumpCache()
+
+    cache.dump(DATA, JsonRenderer)["x"] = 1
+    assert "x" not in cache.dump(DATA, JsonRenderer)
+
+
+def test_reject_lambda_and_closure():
+    cache = DumpCache()
+
+    with pytest.raises(Exception, match="stable name"):
+        cache.dump(DATA, lambda: ConsoleRenderer(no_color=True))
+
+    def factory():
+        return ConsoleRenderer()
+
+    with pytest.raises(Exception, match="stable name"):
+        cache.dump(DATA, factory)
+
+    with pytest.raises(Exception, match="stable name"):
+        cache.dump(DATA, plain, str_decoder=lambda v: (v, "", False))
+
+
+def test_explicit_key():
+    cache = DumpCache()
+
+    uncolored = cache.dump(DATA, lambda: ConsoleRenderer(no_color=True), key="uncolored")
+    colored = cache.dump(DATA, lambda: ConsoleRenderer(no_color=False), key="colored")
+
+    assert uncolored == protod.dump(DATA, plain())
+    assert colored == protod.dump(DATA, ConsoleRenderer())
+
+
+def test_reject_renderer_with_sink():
+    cache = DumpCache()
+
+    with pytest.raises(Exception, match="out"):
+        cache.dump(DATA, partial(ConsoleRenderer, out=io.TextIOWrapper(io.BytesIO())))
+    assert len(cache) == 0
+
+
+def test_lru_eviction():
+    cache = DumpCache(max_bytes=400)
+    for i in range(50):
+        cache.dump(bytes([8, i]), plain)
+
+    assert 0 < len(cache) < 50
+    assert cache._size <= 400
+
+    cache.dump(bytes([8, 49]), plain)  # the most recent one is kept
+    assert cache.hits == 1
+    cache.dump(bytes([8, 0]), plain)  # the oldest one is evicted
+    assert cache.hits == 1
+
+
+def test_not_cached_after_timeout():
+    cache = DumpCache()
+
+    cache.dump(DATA, plain, limits=protod.Limits(timeout=0))
+    assert len(cache) == 0
+
+    cache.dump(DATA, plain, limits=protod.Limits(timeout=10))
+    assert len(cache) == 1
+
+
+def test_disk_store_plain_text(tmp_path):
+    path = str(tmp_path / "cache")
+    expected = protod.dump(DATA, plain())
+
+    DumpCache(path=path).dump(DATA, plain)
+    DumpCache(path=path).dump(DATA, JsonRenderer)  # only strings are stored
+
+    files = os.listdir(path)
+    assert len(files) == 1
+    with open(os.path.join(path, files[0]), encoding="utf-8") as f:
+        assert f.read() == expected
+
+    cache = DumpCache(path=path)
+    assert cache.dump(DATA, plain) == expected
+    assert cache.hits == 1
+
+
+def test_format_version_is_part_of_the_key(tmp_path, monkeypatch):
+    path = str(tmp_path / "cache")
+    DumpCache(path=path).dump(DATA, plain)
+
+    # results stored by an older version are not served
+    monkeypatch.setattr(protod.cache, "FORMAT_VERSION", protod.cache.FORMAT_VERSION + 1)
+    cache = DumpCache(path=path)
+    cache.dump(DATA, plain)
+    assert (cache.hits, cache.misses) == (0, 1)
+
+
+def test_reject_writable_directory(tmp_path):
+    os.chmod(tmp_path, 0o777)
+
+    with pytest.raises(Exception, match="writable"):
+        DumpCache(path=str(tmp_path))
@@ -0,0 +1,45 @@
+from protod import ConsoleRenderer, dump, parse
+from protod.field import RepeatedField
+
+# field 1, field 2, field 1 again
+NON_ADJACENT = bytes.fromhex("080110020803")
+
+
+def test_adjacent_fields_are_grouped():
+    fields = parse(bytes.fromhex("0801080210030804"))
+
+    assert [type(f) for f in fields] == [RepeatedField, type(fields[1]), type(fields[2])]
+    assert [f.u64 for f in fields[0].items] == [1, 2]
+    assert fields[0].length == 4
+
+
+def test_non_adjacent_fields_keep_wire_order():
+    fields = parse(NON_ADJACENT)
+
+    assert [f.u64 for f in fields] == [1, 2, 3]
+
+    tree = dump(NON_ADJACENT, ConsoleRenderer())
+    stream = dump(NON_ADJACENT, ConsoleRenderer(), streaming=True)
+    assert tree == stream
+
+
+def test_index_merges_non_adjacent_fields():
+    index = {}
+    fields = parse(NON_ADJACENT, index=index)
+
+    assert [f.u64 for f in index[1].items] == [1, 3]
+    assert index[2].u64 == 2
+    assert index[1] not in fields  # only lives in the index
+
+
+def test_struct_get():
+    data = bytes.fromhex("1a06080110020803")
+
+    # index built while decoding
+    assert [f.u64 for f in parse(data)[0].get(1).items] == [1, 3]
+
+    # index built from already decoded fields, which are left untouched
+    struct = parse(data)[0]
+    assert len(struct.as_fields) == 3
+    assert [f.u64 for f in struct.get(1).items] == [1, 3]
+    assert [f.u64 for f in struct.as_fields] == [1, 2, 3]
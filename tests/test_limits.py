@@ -0,0 +1,79 @@
+import time
+
+from protod import Limits, dump, parse
+
+
+def nested(depth: int) -> bytes:
+    data = bytes.fromhex("0801")
+    for _ in range(depth):
+        data = b"\x0a" + bytes([len(data)]) + data
+    return data
+
+
+def depth_of(fields) -> int:
+    ret = 0
+    while fields and fields[0].idtype.wire_type == 2 and fields[0].as_fields:
+        fields = fields[0].as_fields
+        ret += 1
+    return ret
+
+
+def test_max_depth():
+    data = nested(5)
+
+    assert depth_of(parse(data)) == 5
+    assert depth_of(parse(data, limits=Limits(max_depth=2))) == 2
+
+
+def test_max_fields():
+    data = bytes.fromhex("0801") * 10
+
+    fields = parse(data, limits=Limits(max_fields=4))
+
+    assert [f.u64 for f in fields[0].items] == [1] * 4
+    remainder = fields[-1]
+    assert remainder.idtype.id == 0
+    assert remainder.offset == 8 and remainder.end == len(data)
+    assert remainder.as_str == data[8:]
+
+    # a child message is decoded as a whole or shown as bytes
+    data = bytes.fromhex("0a0408011002") + bytes.fromhex("1001")
+    fields = parse(data, limits=Limits(max_fields=3))
+    assert fields[0].as_fields == []
+    assert fields[1].u64 == 1
+
+
+def test_max_detect_bytes():
+    data = b"\x0a\x05hello\x12\x05world"
+
+    fields = parse(data, limits=Limits(max_detect_bytes=5))
+
+    assert fields[0].is_str
+    assert not fields[1].is_str
+
+
+def test_timeout():
+    data = bytes.fromhex("0801") * 1_000_000
+
+    start = time.perf_counter()
+    fields = parse(data, limits=Limits(timeout=0.05))
+    assert time.perf_counter() - start < 1
+
+    remainder = fields[-1]
+    assert remainder.idtype.id == 0
+    assert remainder.end == len(data)
+    assert remainder.offset == fields[0].length
+
+    # same in streaming mode
+    start = time.perf_counter()
+    s = dump(data, limits=Limits(timeout=0.05), streaming=True)
+    assert time.perf_counter() - start < 2
+    assert "08 01 08 01" in s
+
+
+def test_timeout_not_applied_after_lazy_parse():
+    fields = parse(b"\x0a\x02\x08\x01", lazy=True, limits=Limits(timeout=0.01))
+
+    time.sleep(0.02)
+
+    assert fields[0].as_fields[0].u64 == 1
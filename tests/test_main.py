@@ -0,0 +1,76 @@
+import json
+import os
+import subprocess
+import sys
+
+from test_stream import MESSAGES, grpc_framed, varint_framed
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROTO = bytes.fromhex("0a0568656c6c6f1096011a0408011002")
+
+
+def run_cli(*args, stdin=None) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, "-m", "protod.main", *args],
+        cwd=ROOT,
+        env={**os.environ, "PYTHONPATH": ROOT},
+        input=stdin,
+        capture_output=True,
+        timeout=30,
+    )
+
+
+def test_file(tmp_path):
+    path = tmp_path / "x.bin"
+    path.write_bytes(PROTO)
+
+    p = run_cli("--file", str(path))
+    assert p.returncode == 0
+    assert b"hello" in p.stdout
+
+
+def test_file_from_stdin(tmp_path):
+    path = tmp_path / "x.bin"
+    path.write_bytes(PROTO)
+    expected = run_cli("--file", str(path)).stdout
+
+    # a pipe is not a regular file, it can't be memory mapped
+    p = run_cli("--file", "/dev/stdin", stdin=PROTO)
+    assert p.returncode == 0
+    assert p.stdout == expected
+
+
+def test_empty_file(tmp_path):
+    path = tmp_path / "empty.bin"
+    path.write_bytes(b"")
+
+    assert run_cli("--file", str(path)).returncode == 0
+
+
+def test_framing(tmp_path):
+    path = tmp_path / "stream.bin"
+    path.write_bytes(varint_framed(MESSAGES))
+
+    p = run_cli("--framing", "varint", "--file", str(path))
+    assert p.returncode == 0
+    assert p.stdout.count(b"# message") == len(MESSAGES)
+    assert b"hello" in p.stdout
+
+
+def test_framing_grpc_gzip_json(tmp_path):
+    path = tmp_path / "stream.bin"
+    path.write_bytes(grpc_framed(MESSAGES[:3], compressed=True))
+
+    p = run_cli("--framing", "grpc", "--json", "--file", str(path))
+    assert p.returncode == 0
+    assert [json.loads(line) for line in p.stdout.splitlines()] == [{"1": 1}, {"1": "hello"}, {}]
+
+
+def test_framing_truncated(tmp_path):
+    path = tmp_path / "stream.bin"
+    path.write_bytes(varint_framed(MESSAGES)[:-1])
+
+    p = run_cli("--framing", "varint", "--file", str(path))
+    assert p.returncode != 0
+    assert b"truncated message" in p.stderr
@@ -0,0 +1,90 @@
+import struct
+
+import pytest
+
+from protod import PackedType, parse
+from protod.packed import decode_packed
+
+
+def encode_varint(n: int) -> bytes:
+    out = bytearray()
+    while True:
+        b = n & 0x7F
+        n >>= 7
+        if n:
+            out.append(b | 0x80)
+        else:
+            out.append(b)
+            return bytes(out)
+
+
+def packed(values, packed_type):
+    view = memoryview(values)
+    return list(decode_packed(view, packed_type, use_numpy=False))
+
+
+def test_varint_one_byte():
+    assert packed(bytes([1, 2, 3]), PackedType.Varint) == [1, 2, 3]
+    assert packed(bytes(range(8)), PackedType.Varint) == list(range(8))
+
+
+def test_varint_from_struct():
+    struct_field = parse(bytes.fromhex("0a03010203"))[0]
+    assert list(struct_field.as_packed(PackedType.Varint, use_numpy=False)) == [1, 2, 3]
+
+
+def test_varint_multi_byte():
+    values = [0, 1, 127, 128, 300, 2**32, 2**64 - 1]
+    data = b"".join(encode_varint(n) for n in values)
+    assert packed(data, PackedType.Varint) == values
+
+
+def test_varint_masked_to_64_bits():
+    # 10th byte above 0x01, same as `decode_varint`
+    data = b"\xff" * 9 + b"\x7f"
+    assert packed(data, PackedType.Varint) == [2**64 - 1]
+
+
+def test_varint_truncated():
+    with pytest.raises(Exception, match="truncated"):
+        packed(b"\x80", PackedType.Varint)
+
+
+def test_int64():
+    values = [0, 1, -1, -(2**63), 2**63 - 1]
+    data = b"".join(encode_varint(n & 0xFFFFFFFFFFFFFFFF) for n in values)
+    assert packed(data, PackedType.Int64) == values
+    assert packed(bytes([1, 2]), PackedType.Int64) == [1, 2]
+
+
+def test_sint64():
+    values = [0, -1, 1, -2, 2, -(2**63), 2**63 - 1]
+    data = b"".join(encode_varint((n << 1) ^ (n >> 63)) for n in values)
+    assert packed(data, PackedType.Sint64) == values
+    assert packed(bytes([0, 1, 2, 3]), PackedType.Sint64) == [0, -1, 1, -2]
+
+
+@pytest.mark.parametrize(
+    "packed_type, fmt, values",
+    [
+        (PackedType.Fixed32, "I", [0, 1, 2**32 - 1]),
+        (PackedType.Sfixed32, "i", [0, -1, 2**31 - 1]),
+        (PackedType.Float, "f", [0.0, 1.5, -2.25]),
+        (PackedType.Fixed64, "Q", [0, 1, 2**64 - 1]),
+        (PackedType.Sfixed64, "q", [0, -1, 2**63 - 1]),
+        (PackedType.Double, "d", [0.0, 1.5, -2.25]),
+    ],
+)
+def test_fixed(packed_type, fmt, values):
+    data = struct.pack(f"<{len(values)}{fmt}", *values)
+    assert packed(data, packed_type) == values
+
+
+def test_fixed_bad_length():
+    with pytest.raises(Exception, match="not a multiple"):
+        packed(b"\x00\x00\x00", PackedType.Fixed32)
+
+
+def test_unknown_type():
+    with pytest.raises(Exception, match="Unknown packed type"):
+        packed(b"\x00", "bad")
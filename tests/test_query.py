@@ -0,0 +1,40 @@
+import pytest
+
+from protod import Path, get
+
+# field 1: {field 2: 150, field 3: {field 4: "hi"}}, field 5: 1
+DATA = bytes.fromhex("0a091096011a0422026869" "2801")
+
+
+def test_hit():
+    assert get(DATA, "1.2").u64 == 150
+    assert get(DATA, [5]).u64 == 1
+    assert get(DATA, "1.3.4").as_str == "hi"
+
+
+def test_miss():
+    assert get(DATA, "9") is None
+    assert get(DATA, "1.9", default=0) == 0
+    assert get(DATA, "5.1") is None  # not a message
+    assert get(DATA, "1.2.1") is None
+
+
+def test_find_all_repeated():
+    data = bytes.fromhex("0a020801" "0a020802" "1001" "0a020803")
+
+    assert [f.u64 for f in Path("1.1").find_all(data)] == [1, 2, 3]
+
+
+def test_string_on_path():
+    # field 1 is the bytes `10 05 ff`, `dump` shows it as bytes, not as a message
+    assert get(b"\x0a\x03\x10\x05\xff", "1.2") is None
+
+    # the strings are not searched either
+    assert get(b"\x0a\x05hello", "1.13") is None
+
+
+def test_invalid_path():
+    with pytest.raises(Exception):
+        Path("1.x")
+    with pytest.raises(Exception):
+        Path("")
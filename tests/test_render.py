@@ -0,0 +1,59 @@
+import protod
+from protod import ConsoleRenderer, HtmlRenderer, JsonRenderer
+from protod.decode import _walkable
+
+DATA = bytes.fromhex("0a0568656c6c6f10011a0408021003")
+
+
+def encode_varint(n: int) -> bytes:
+    out = bytearray()
+    while True:
+        b = n & 0x7F
+        n >>= 7
+        if n:
+            out.append(b | 0x80)
+        else:
+            out.append(b)
+            return bytes(out)
+
+
+def test_walkable():
+    assert _walkable(ConsoleRenderer())
+    assert _walkable(HtmlRenderer())
+    assert _walkable(JsonRenderer())
+
+
+def test_render_struct_override():
+    class StructCounter(ConsoleRenderer):
+        structs = 0
+
+        def render_struct(self, struct):
+            StructCounter.structs += 1
+            super().render_struct(struct)
+
+    assert not _walkable(StructCounter())
+    result = protod.dump(DATA, StructCounter(no_color=True))
+
+    assert StructCounter.structs == 2
+    assert result == protod.dump(DATA, ConsoleRenderer(no_color=True))
+
+
+def test_render_repeated_fields_override():
+    class NoRepeated(ConsoleRenderer):
+        def render_repeated_fields(self, repeated):
+            self._add_normal("repeated\n")
+
+    result = protod.dump(bytes.fromhex("08010802"), NoRepeated(no_color=True))
+    assert result == "repeated\n"
+
+
+def test_deep_nesting():
+    data = b"\x08\x01"
+    for _ in range(2000):  # far beyond the recursion limit
+        data = b"\x0a" + encode_varint(len(data)) + data
+
+    result = protod.dump(data, ConsoleRenderer(no_color=True))
+    assert result.count("\n") == 2001
+
+    streamed = protod.dump(data, ConsoleRenderer(no_color=True), streaming=True)
+    assert streamed == result
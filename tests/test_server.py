@@ -0,0 +1,94 @@
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def start_server(path: str) -> subprocess.Popen:
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "protod.main", "serve", "--unix", path, "--workers", "1"],
+        cwd=ROOT,
+        env={**os.environ, "PYTHONPATH": ROOT},
+        stderr=subprocess.PIPE,
+    )
+    for _ in range(200):
+        if os.path.exists(path) or proc.poll() is not None:
+            break
+        time.sleep(0.05)
+    return proc
+
+
+def stop_server(proc: subprocess.Popen):
+    proc.send_signal(signal.SIGINT)
+    proc.wait(10)
+
+
+def request(path: str, target: str, body: bytes) -> bytes:
+    with socket.socket(socket.AF_UNIX) as s:
+        s.settimeout(10)
+        s.connect(path)
+        s.sendall(
+            f"POST {target} HTTP/1.1\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body
+        )
+        response = b""
+        while chunk := s.recv(4096):
+            response += chunk
+        return response
+
+
+@pytest.fixture
+def server(tmp_path):
+    path = str(tmp_path / "protod.sock")
+    proc = start_server(path)
+    yield path
+    if proc.poll() is None:
+        stop_server(proc)
+
+
+def test_decode(server):
+    response = request(server, "/?input=hex&format=json", b"08 01")
+    assert response.startswith(b"HTTP/1.1 200")
+    assert response.endswith(b'{"1":1}')
+
+
+def test_bad_parameter(server):
+    response = request(server, "/?input=hex&max_bin=abc", b"08 01")
+    assert response.startswith(b"HTTP/1.1 400")
+    assert b"invalid max_bin" in response
+
+
+def test_remove_socket_on_exit(tmp_path):
+    path = str(tmp_path / "protod.sock")
+    stop_server(start_server(path))
+    assert not os.path.exists(path)
+
+
+def test_keep_existing_file(tmp_path):
+    path = tmp_path / "notes.txt"
+    path.write_text("notes")
+
+    proc = start_server(str(path))
+    proc.wait(10)
+
+    assert proc.returncode != 0  # failed to bind
+    assert path.read_text() == "notes"
+
+
+def test_spawn_without_forkserver(monkeypatch):
+    import multiprocessing
+
+    from protod.server import Server
+
+    monkeypatch.setattr(multiprocessing, "get_all_start_methods", lambda: ["spawn"])
+
+    server = Server(workers=1)
+    try:
+        assert server.executor._mp_context.get_start_method() == "spawn"
+    finally:
+        server.executor.shutdown()
@@ -0,0 +1,94 @@
+import gzip
+import io
+import struct
+
+import pytest
+
+from protod import Framing, iter_messages
+
+MESSAGES = [bytes.fromhex("0801"), b"\x0a\x05hello", b"", bytes.fromhex("1096" + "01") * 100]
+
+
+def varint_framed(messages) -> bytes:
+    out = bytearray()
+    for m in messages:
+        n = len(m)
+        while n >= 0x80:
+            out.append(n & 0x7F | 0x80)
+            n >>= 7
+        out.append(n)
+        out += m
+    return bytes(out)
+
+
+def grpc_framed(messages, compressed=False) -> bytes:
+    out = bytearray()
+    for m in messages:
+        if compressed:
+            m = gzip.compress(m)
+        out += struct.pack(">BI", int(compressed), len(m)) + m
+    return bytes(out)
+
+
+def decode(data: bytes, framing):
+    return list(iter_messages(io.BytesIO(data), framing=framing))
+
+
+def check(messages, decoded):
+    assert len(decoded) == len(messages)
+    assert decoded[0][0].u64 == 1
+    assert decoded[1][0].as_str == "hello"
+    assert decoded[2] == []
+    assert len(decoded[3][0].items) == 100  # 300 bytes, a 2-byte length prefix
+
+
+def test_varint():
+    check(MESSAGES, decode(varint_framed(MESSAGES), Framing.Varint))
+
+
+def test_grpc():
+    check(MESSAGES, decode(grpc_framed(MESSAGES), Framing.Grpc))
+
+
+def test_grpc_gzip():
+    check(MESSAGES, decode(grpc_framed(MESSAGES, compressed=True), Framing.Grpc))
+
+
+def test_empty_stream():
+    assert decode(b"", Framing.Varint) == []
+    assert decode(b"", Framing.Grpc) == []
+
+
+def test_truncated_varint_prefix():
+    data = varint_framed(MESSAGES[:1]) + b"\x80"
+
+    with pytest.raises(Exception, match="truncated varint length prefix"):
+        decode(data, Framing.Varint)
+
+
+def test_truncated_body():
+    with pytest.raises(Exception, match="truncated message"):
+        decode(varint_framed(MESSAGES)[:-1], Framing.Varint)
+
+    with pytest.raises(Exception, match="truncated message"):
+        decode(grpc_framed(MESSAGES)[:-1], Framing.Grpc)
+
+
+def test_truncated_grpc_header():
+    with pytest.raises(Exception, match="truncated grpc message header"):
+        decode(grpc_framed(MESSAGES[:1]) + b"\x00\x00", Framing.Grpc)
+
+
+def test_messages_are_read_one_by_one():
+    f = io.BytesIO(varint_framed(MESSAGES[:2]) + b"\x80")  # broken after 2 messages
+
+    messages = iter_messages(f, framing=Framing.Varint)
+    assert next(messages)[0].u64 == 1
+    assert next(messages)[0].as_str == "hello"
+    with pytest.raises(Exception):
+        next(messages)
+
+
+def test_unknown_framing():
+    with pytest.raises(Exception, match="Unknown framing"):
+        decode(b"", "xml")